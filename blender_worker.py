@@ -0,0 +1,215 @@
+"""
+Long-lived headless Blender worker.
+
+Keeps Blender, the loaded scene and the mesh/material/template caches warm and
+runs build / inspect / render commands sent over a local socket, so iterating
+on layouts doesn't pay Blender startup and DAE imports on every step.
+
+Start it (or use `python worker_client.py start`):
+    blender -b -P blender_worker.py -- --port 8765
+
+Protocol: one JSON object per line in each direction.
+    {"cmd": "build", "args": {"save": "optics_table.blend"}}
+    -> {"ok": true, "result": ..., "output": "<captured prints>", "elapsed": 0.42}
+
+Only listens on localhost. Sibling modules are reloaded when their files
+change, keeping the caches listed in WARM_STATE.
+"""
+import bpy
+import io
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import importlib
+import traceback
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from script_args import script_argv
+
+DEFAULT_PORT = 8765
+
+# Reload order (dependencies first)
+MODULES = [
+    "materials",
+    "robot_description",
+    "scene_build",
+    "reach_viz",
+    "human_proxies",
+    "scene_diff",
+    "gantry_load",
+    "create_optics_table",
+    "render_optics_table",
+    "inspect_blend_file",
+]
+
+# Module-level caches carried over when a module is reloaded
+WARM_STATE = {
+    "materials": ["_CANONICAL"],
+    "robot_description": ["_LOADED"],
+    "scene_build": ["_MESH_CACHE"],
+    "reach_viz": ["_UNIT_SPHERES"],
+    "human_proxies": ["_TEMPLATES"],
+}
+
+_mtimes = {}
+
+
+def _module_mtime(name):
+    return os.path.getmtime(os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{name}.py"))
+
+
+def load_modules():
+    """
+    Imports the scene modules; if any file changed since the last call,
+    reloads all of them in dependency order (so `from x import y` picks up
+    the new code) while keeping their caches.
+    """
+    changed = any(_mtimes.get(name) != _module_mtime(name) for name in MODULES)
+    for name in MODULES:
+        if name not in sys.modules:
+            importlib.import_module(name)
+        elif changed:
+            module = sys.modules[name]
+            state = {attr: getattr(module, attr) for attr in WARM_STATE.get(name, []) if hasattr(module, attr)}
+            module = importlib.reload(module)
+            for attr, value in state.items():
+                setattr(module, attr, value)
+        _mtimes[name] = _module_mtime(name)
+    return {name: sys.modules[name] for name in MODULES}
+
+
+# --- Commands ---
+
+def cmd_ping(modules, args):
+    return {"blender": bpy.app.version_string, "file": bpy.data.filepath, "objects": len(bpy.data.objects)}
+
+
+def cmd_open(modules, args):
+    bpy.ops.wm.open_mainfile(filepath=os.path.abspath(args["path"]))
+    return {"file": bpy.data.filepath, "objects": len(bpy.data.objects)}
+
+
+def cmd_build(modules, args):
+    path = modules["create_optics_table"].build_and_save(
+        output_path=args.get("save"),
+        compress=args.get("compress", False),
+        reach_mode=args.get("reach_mode"),
+        check_gantry=args.get("check_gantry", False),
+    )
+    return {"saved": path, "objects": len(bpy.data.objects)}
+
+
+def cmd_save(modules, args):
+    path = os.path.abspath(args.get("path") or bpy.data.filepath or "optics_table.blend")
+    modules["materials"].save_blend(path, compress=args.get("compress", False))
+    return {"saved": path}
+
+
+def cmd_inspect(modules, args):
+    if args.get("path"):
+        cmd_open(modules, args)
+    return modules["inspect_blend_file"].scene_summary()
+
+
+def cmd_render(modules, args):
+    output = modules["render_optics_table"].render_table(
+        fast=args.get("fast", False),
+        blend_file_path=args.get("path"),
+        output=args.get("output", "optics_table_render.png"),
+        resolution=tuple(args.get("resolution", (1024, 768))),
+    )
+    return {"output": output}
+
+
+def cmd_render_views(modules, args):
+    # Persistent data stays on, so repeated calls reuse the synced scene
+    return modules["render_optics_table"].render_views(
+        views=args.get("views", ["iso"]),
+        frames=args.get("frames"),
+        fast=args.get("fast", False),
+        blend_file_path=args.get("path"),
+        output_dir=args.get("output_dir", "renders"),
+        resolution=tuple(args.get("resolution", (1024, 768))),
+        threads=args.get("threads"),
+        samples=args.get("samples", 128),
+        stats_path=args.get("stats"),
+    )
+
+
+COMMANDS = {
+    "ping": cmd_ping,
+    "open": cmd_open,
+    "build": cmd_build,
+    "save": cmd_save,
+    "inspect": cmd_inspect,
+    "render": cmd_render,
+    "render_views": cmd_render_views,
+}
+
+
+def handle(request):
+    cmd = request.get("cmd")
+    if cmd == "shutdown":
+        return {"ok": True, "result": "bye", "output": "", "elapsed": 0.0}
+    if cmd not in COMMANDS:
+        return {"ok": False, "error": f"Unknown command '{cmd}'", "output": "", "elapsed": 0.0}
+
+    out = io.StringIO()
+    t0 = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(out):
+            modules = load_modules()
+            result = COMMANDS[cmd](modules, request.get("args", {}))
+        response = {"ok": True, "result": result}
+    except Exception:
+        response = {"ok": False, "error": traceback.format_exc()}
+    response["output"] = out.getvalue()
+    response["elapsed"] = time.perf_counter() - t0
+    return response
+
+
+def serve(port=DEFAULT_PORT, host="127.0.0.1"):
+    """
+    Runs on Blender's main thread (bpy isn't thread-safe) and handles one
+    client connection at a time.
+    """
+    load_modules()
+    server = socket.create_server((host, port))
+    print(f"Blender worker listening on {host}:{port}")
+    with server:
+        while True:
+            conn, _addr = server.accept()
+            with conn, conn.makefile("rw", encoding="utf-8") as stream:
+                for line in stream:
+                    if not line.strip():
+                        continue
+                    try:
+                        request = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        request = {}
+                        response = {"ok": False, "error": f"Bad request: {e}", "output": "", "elapsed": 0.0}
+                    else:
+                        response = handle(request)
+                    stream.write(json.dumps(response) + "\n")
+                    stream.flush()
+                    if request.get("cmd") == "shutdown":
+                        print("Blender worker shutting down")
+                        return
+
+
+def parse_args(argv):
+    argv = script_argv(argv)
+    parser = argparse.ArgumentParser(description="Persistent headless Blender worker")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--open", help="Load this .blend before serving")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv)
+    if args.open:
+        bpy.ops.wm.open_mainfile(filepath=os.path.abspath(args.open))
+    serve(args.port)
@@ -1,6 +1,18 @@
-import bpy
 import math
 import os
+import sys
+import argparse
+
+# Blender doesn't put the script's folder on sys.path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import robot_description
+import human_proxies
+import reach_viz
+import gantry_load
+from scene_build import (build_session, clear_scene, new_empty, new_mesh_object, box_mesh,
+                         cylinder_mesh, import_mesh_instance)
+from materials import get_material, save_blend
+from script_args import script_argv
 
 def create_rexroth_gantry(table_width, table_depth, table_height, gantry_height=2.0, offset=(0,0,0), extra_beams_x=None):
     """
@@ -13,27 +25,12 @@ def create_rexroth_gantry(table_width, table_depth, table_height, gantry_height=
     # Profile dimensions (e.g., 80x80mm)
     profile_size = 0.08
     
-    mat_alum = bpy.data.materials.get("Rexroth_Alum")
-    if not mat_alum:
-        mat_alum = bpy.data.materials.new(name="Rexroth_Alum")
-        mat_alum.diffuse_color = (0.7, 0.7, 0.75, 1)
-        mat_alum.metallic = 0.9
-        mat_alum.roughness = 0.3
+    mat_alum = get_material("Rexroth_Alum")
 
     def create_profile(name, size, length, location, rotation=(0,0,0)):
-        bpy.ops.mesh.primitive_cube_add(size=1, location=(0,0,0))
-        obj = bpy.context.active_object
-        obj.name = name
-        obj.data.materials.append(mat_alum)
-        
-        # Scale to dimensions
+        # Scale to dimensions (baked into the mesh)
         # Z is length
-        obj.scale = (size, size, length)
-        bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
-        
-        obj.location = location
-        obj.rotation_euler = rotation
-        return obj
+        return new_mesh_object(name, box_mesh(name, (size, size, length)), location, rotation, material=mat_alum)
 
     # 4 Vertical Legs
     # Corners of the table assembly
@@ -72,312 +69,68 @@ def create_rexroth_gantry(table_width, table_depth, table_height, gantry_height=
     
     return oz + gantry_height
 
-def create_optics_table():
-    # 1. Clear existing objects
-    bpy.ops.object.select_all(action='SELECT')
-    bpy.ops.object.delete()
-
-    # Dimensions
-    # Two tables: 1m x 3m each.
-    single_table_width = 1.0
-    single_table_depth = 3.0
-    table_thickness = 0.3
-    hole_spacing = 0.025
-    leg_height = 0.8
-    leg_radius = 0.05 # Slightly thinner legs for individual tables
-    
-    total_width = single_table_width * 2
-    
-    # Helper to create one table
-    def create_single_table(name_suffix, offset_x):
-        # Table Top
-        bpy.ops.mesh.primitive_cube_add(
-            size=1, 
-            location=(offset_x, 0, leg_height + table_thickness / 2)
-        )
-        table_top = bpy.context.active_object
-        table_top.name = f"TableTop_{name_suffix}"
-        table_top.scale = (single_table_width, single_table_depth, table_thickness)
-        bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
-        
-        # Legs
-        leg_off_x = (single_table_width / 2) - 0.15
-        leg_off_y = (single_table_depth / 2) - 0.15
-        
-        leg_positions = [
-            (offset_x + leg_off_x, leg_off_y),
-            (offset_x - leg_off_x, leg_off_y),
-            (offset_x + leg_off_x, -leg_off_y),
-            (offset_x - leg_off_x, -leg_off_y)
-        ]
-        
-        for i, (lx, ly) in enumerate(leg_positions):
-            bpy.ops.mesh.primitive_cylinder_add(
-                radius=leg_radius, 
-                depth=leg_height, 
-                location=(lx, ly, leg_height / 2)
-            )
-            leg = bpy.context.active_object
-            leg.name = f"Leg_{name_suffix}_{i+1}"
-            
-        # Holes (Visual)
-        hole_radius = 0.003
-        hole_depth = 0.001
-        
-        # Start relative to table center
-        start_x_local = -(single_table_width / 2) + 0.05
-        start_y_local = -(single_table_depth / 2) + 0.05
-        
-        # Global start
-        start_x = offset_x + start_x_local
-        start_y = start_y_local
-        
-        bpy.ops.mesh.primitive_cylinder_add(
-            radius=hole_radius,
-            depth=hole_depth,
-            location=(start_x, start_y, leg_height + table_thickness - (hole_depth/2) + 0.0001) 
-        )
-        hole_obj = bpy.context.active_object
-        hole_obj.name = f"Hole_Grid_{name_suffix}"
-        
-        mat_hole = bpy.data.materials.get("Hole_Mat")
-        if not mat_hole:
-            mat_hole = bpy.data.materials.new(name="Hole_Mat")
-            mat_hole.diffuse_color = (0.0, 0.0, 0.0, 1)
-            mat_hole.roughness = 1.0
-            mat_hole.specular_intensity = 0.0
-        hole_obj.data.materials.append(mat_hole)
-        
-        count_x = int((single_table_width - 0.1) / hole_spacing)
-        count_y = int((single_table_depth - 0.1) / hole_spacing)
-
-        mod_x = hole_obj.modifiers.new(name="Array_X", type='ARRAY')
-        mod_x.count = count_x
-        mod_x.use_relative_offset = False
-        mod_x.use_constant_offset = True
-        mod_x.constant_offset_displace = (hole_spacing, 0, 0)
-
-        mod_y = hole_obj.modifiers.new(name="Array_Y", type='ARRAY')
-        mod_y.count = count_y
-        mod_y.use_relative_offset = False
-        mod_y.use_constant_offset = True
-        mod_y.constant_offset_displace = (0, hole_spacing, 0)
-        
-        mat_table = bpy.data.materials.get("Table_Mat")
-        if not mat_table:
-            mat_table = bpy.data.materials.new(name="Table_Mat")
-            mat_table.diffuse_color = (0.8, 0.8, 0.8, 1)
-            mat_table.roughness = 0.4
-            mat_table.metallic = 0.8
-        table_top.data.materials.append(mat_table)
-        
-        return leg_height + table_thickness
-
-    # Create 2 tables
-    # Left table (center at -0.5)
-    surface_z = create_single_table("Left", -0.5)
-    # Right table (center at +0.5)
-    create_single_table("Right", 0.5)
-    
-    # Create Gantry
-    gantry_h = create_rexroth_gantry(total_width, single_table_depth, surface_z, gantry_height=2.5)
-    
-    return surface_z, gantry_h
-
-
-
-def create_franka_arm(name_prefix, location, rotation_z=0):
+def create_franka_arm(name_prefix, location, rotation_z=0, robot="fr3"):
     """
-    Creates a Franka FR3 arm by importing DAE meshes.
+    Creates a Franka arm by importing DAE meshes.
     Uses a Frame (Empty) + Mesh hierarchy to preserve DAE visual offsets.
+    Joint origins and visual origins come from the URDF/xacro in
+    franka_description (see robot_description.py), cached on disk.
     """
-    import os
-    
-    # Base path
-    base_path = os.path.join(os.path.dirname(__file__), "franka_description/meshes")
-    arm_path = os.path.join(base_path, "robot_arms/fr3/visual")
-    hand_path = os.path.join(base_path, "robot_ee/franka_hand_white/visual")
-    
-    # Kinematics from YAML (hardcoded here for simplicity)
-    # xyz, rpy (radians)
-    joints = {
-        'joint1': {'xyz': (0, 0, 0.333), 'rpy': (0, 0, 0)},
-        'joint2': {'xyz': (0, 0, 0), 'rpy': (-1.57079632679, 0, 0)},
-        'joint3': {'xyz': (0, -0.316, 0), 'rpy': (1.57079632679, 0, 0)},
-        'joint4': {'xyz': (0.0825, 0, 0), 'rpy': (1.57079632679, 0, 0)},
-        'joint5': {'xyz': (-0.0825, 0.384, 0), 'rpy': (-1.57079632679, 0, 0)},
-        'joint6': {'xyz': (0, 0, 0), 'rpy': (1.57079632679, 0, 0)},
-        'joint7': {'xyz': (0.088, 0, 0), 'rpy': (1.57079632679, 0, 0)},
-        'joint8': {'xyz': (0, 0, 0.107), 'rpy': (0, 0, 0)}, # Flange
-    }
+    chain = robot_description.load_robot(robot=robot)
 
     def create_link_frame(name, parent, xyz, rpy):
         # Create an Empty to represent the Joint/Link Frame
-        bpy.ops.object.empty_add(type='PLAIN_AXES', radius=0.05, location=(0,0,0))
-        frame = bpy.context.active_object
-        frame.name = name
-        
         if parent:
-            frame.parent = parent
-            frame.location = xyz
-            frame.rotation_euler = rpy
-        else:
-            frame.location = location
-            frame.rotation_euler = (0, 0, rotation_z)
-            
-        return frame
+            return new_empty(name, xyz, rpy, parent=parent)
+        return new_empty(name, location, (0, 0, rotation_z))
 
     def import_mesh_to_frame(file_path, frame, name):
-        if not os.path.exists(file_path):
-            print(f"Warning: Mesh not found: {file_path}")
-            return
-            
-        bpy.ops.object.select_all(action='DESELECT')
-        bpy.ops.wm.collada_import(filepath=file_path)
-        imported = bpy.context.selected_objects
-        
-        if not imported:
-            return
-            
-        # Apply Scale ONLY (0.001 -> 1.0)
-        # But DO NOT apply Location/Rotation, as that burns the DAE offset into the mesh vertices
-        # and resets origin to 0,0,0, which is what we want IF we parent to frame.
-        # Wait, if we parent to frame, we want the mesh to keep its local offset relative to frame.
-        # The DAE import sets obj.location to the offset.
-        # So we just parent.
-        
-        # However, we MUST fix the scale (0.001).
-        # If we apply scale, it scales the location offset too? Yes.
-        # So:
-        # 1. Parent to Frame.
-        # 2. Apply Scale.
-        
-        root_obj = imported[0]
-        if len(imported) > 1:
-            bpy.context.view_layer.objects.active = root_obj
-            bpy.ops.object.join()
-            root_obj = bpy.context.active_object
-            
-        root_obj.name = name
-        root_obj.parent = frame
-        
-        # The DAE import might have set a global scale 0.001.
-        # We want to apply this scale so the object is 1.0 but small.
-        bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
-        
-        return root_obj
+        # The DAE is imported once (scale applied, location/rotation offset kept
+        # on the object); later arms share the same mesh datablock.
+        return import_mesh_instance(file_path, name, parent=frame)
 
     # --- Assembly ---
+    # Walk the joint tree (parents come before children).
+    # Object names keep the original scheme (see robot_description.FRAME_NAMES):
+    # fr3_link1 -> {prefix}_L1_Frame + {prefix}_link1_mesh, fr3_link8 -> {prefix}_Hand_Frame
+    
+    def attach_visuals(link, frame):
+        short = robot_description.mesh_name(chain, link)
+        for i, visual in enumerate(chain["visuals"].get(link, [])):
+            mesh_name = f"{name_prefix}_{short}_mesh" if i == 0 else f"{name_prefix}_{short}_mesh_{i}"
+            target = frame
+            # Non-zero <visual><origin> gets its own frame, so the DAE offset stays intact
+            if any(visual["xyz"]) or any(visual["rpy"]):
+                visual_frame = f"{name_prefix}_{robot_description.frame_name(chain, link)}_Visual_{i}_Frame"
+                target = create_link_frame(visual_frame, frame, visual["xyz"], visual["rpy"])
+            # COLLADA import honours the file's <unit>, so URDF mesh scale is not applied here
+            import_mesh_to_frame(visual["mesh"], target, mesh_name)
+
+    links = chain["links"]
+    frames = [None] * len(links)
     
-    # Link 0 (Base)
+    # Root link (Base)
     # Frame is at robot base location
-    f0 = create_link_frame(f"{name_prefix}_L0_Frame", None, (0,0,0), (0,0,0))
-    import_mesh_to_frame(os.path.join(arm_path, "link0.dae"), f0, f"{name_prefix}_link0_mesh")
-    
-    # Link 1
-    f1 = create_link_frame(f"{name_prefix}_L1_Frame", f0, joints['joint1']['xyz'], joints['joint1']['rpy'])
-    import_mesh_to_frame(os.path.join(arm_path, "link1.dae"), f1, f"{name_prefix}_link1_mesh")
-    
-    # Link 2
-    f2 = create_link_frame(f"{name_prefix}_L2_Frame", f1, joints['joint2']['xyz'], joints['joint2']['rpy'])
-    import_mesh_to_frame(os.path.join(arm_path, "link2.dae"), f2, f"{name_prefix}_link2_mesh")
-    
-    # Link 3
-    f3 = create_link_frame(f"{name_prefix}_L3_Frame", f2, joints['joint3']['xyz'], joints['joint3']['rpy'])
-    import_mesh_to_frame(os.path.join(arm_path, "link3.dae"), f3, f"{name_prefix}_link3_mesh")
-    
-    # Link 4
-    f4 = create_link_frame(f"{name_prefix}_L4_Frame", f3, joints['joint4']['xyz'], joints['joint4']['rpy'])
-    import_mesh_to_frame(os.path.join(arm_path, "link4.dae"), f4, f"{name_prefix}_link4_mesh")
-    
-    # Link 5
-    f5 = create_link_frame(f"{name_prefix}_L5_Frame", f4, joints['joint5']['xyz'], joints['joint5']['rpy'])
-    import_mesh_to_frame(os.path.join(arm_path, "link5.dae"), f5, f"{name_prefix}_link5_mesh")
-    
-    # Link 6
-    f6 = create_link_frame(f"{name_prefix}_L6_Frame", f5, joints['joint6']['xyz'], joints['joint6']['rpy'])
-    import_mesh_to_frame(os.path.join(arm_path, "link6.dae"), f6, f"{name_prefix}_link6_mesh")
-    
-    # Link 7
-    f7 = create_link_frame(f"{name_prefix}_L7_Frame", f6, joints['joint7']['xyz'], joints['joint7']['rpy'])
-    import_mesh_to_frame(os.path.join(arm_path, "link7.dae"), f7, f"{name_prefix}_link7_mesh")
-    
-    # Hand (Flange)
-    f_hand = create_link_frame(f"{name_prefix}_Hand_Frame", f7, joints['joint8']['xyz'], joints['joint8']['rpy'])
-    # Hand mesh usually needs rotation? 
-    # In franka_hand.xacro, the hand joint is fixed.
-    # Let's import hand.dae. It might need -45 deg rotation (pi/4) as seen in some configs, or it aligns naturally.
-    # The kinematics.yaml has joint8 (flange).
-    # The hand is attached to the flange.
-    # Usually hand.dae origin is at the mounting plate.
-    # Let's try importing without extra rotation first, or check xacro.
-    # franka_arm.xacro: <joint name="${prefix}joint8" type="fixed"> ... <child link="${prefix}link8" />
-    # Then hand is attached to link8?
-    # Actually, `fr3.urdf.xacro` includes `franka_hand.xacro` connected to `link8`.
-    # <xacro:franka_hand connected_to="fr3_link8" safety_distance="0.03"/>
-    # In `franka_hand.xacro`:
-    # <joint name="${ns}_hand_joint" type="fixed">
-    #   <parent link="${connected_to}"/>
-    #   <child link="${ns}_hand"/>
-    #   <origin xyz="0 0 0" rpy="0 0 ${pi/4}"/>
-    # </joint>
-    # So Hand is rotated 45 degrees (pi/4) relative to Flange (Link 8).
-    
-    # Create Hand Frame
-    f_hand_actual = create_link_frame(f"{name_prefix}_Hand_Actual_Frame", f_hand, (0,0,0), (0, 0, math.pi/4))
-    import_mesh_to_frame(os.path.join(hand_path, "hand.dae"), f_hand_actual, f"{name_prefix}_hand_mesh")
-    
-    # Fingers
-    # Finger joint: prismatic.
-    # <axis xyz="0 0 1" /> ? No, usually Y or X.
-    # In `franka_hand.xacro`:
-    # <joint name="${ns}_finger_joint1" type="prismatic">
-    #   <origin xyz="0 0 0.0584" rpy="0 0 0"/>
-    #   <axis xyz="0 1 0"/>
-    # </joint>
-    # <joint name="${ns}_finger_joint2" type="prismatic">
-    #   <origin xyz="0 0 0.0584" rpy="0 0 ${pi}"/>
-    #   <axis xyz="0 1 0"/>
-    # </joint>
-    
-    f_finger1 = create_link_frame(f"{name_prefix}_Finger1_Frame", f_hand_actual, (0, 0, 0.0584), (0,0,0))
-    import_mesh_to_frame(os.path.join(hand_path, "finger.dae"), f_finger1, f"{name_prefix}_finger1_mesh")
-    
-    f_finger2 = create_link_frame(f"{name_prefix}_Finger2_Frame", f_hand_actual, (0, 0, 0.0584), (0, 0, math.pi))
-    import_mesh_to_frame(os.path.join(hand_path, "finger.dae"), f_finger2, f"{name_prefix}_finger2_mesh")
+    frames[0] = create_link_frame(f"{name_prefix}_{robot_description.frame_name(chain, links[0])}_Frame", None, (0,0,0), (0,0,0))
+    attach_visuals(links[0], frames[0])
+    
+    for joint in chain["joints"]:
+        link = links[joint["child"]]
+        name = f"{name_prefix}_{robot_description.frame_name(chain, link)}_Frame"
+        frames[joint["child"]] = create_link_frame(name, frames[joint["parent"]], joint["xyz"], joint["rpy"])
+        attach_visuals(link, frames[joint["child"]])
 
-    return f0
+    return frames[0]
 
 def create_reach_sphere(location):
     """
     Creates a semi-transparent sphere representing the robot's reach.
     Franka FR3 reach is ~855mm.
+    How it is drawn depends on reach_viz.set_reach_mode().
     """
     radius = 0.855
     
-    bpy.ops.mesh.primitive_uv_sphere_add(radius=radius, location=location)
-    sphere = bpy.context.active_object
-    sphere.name = "Reach_Sphere"
-    
-    mat_reach = bpy.data.materials.get("Reach_Mat")
-    if not mat_reach:
-        mat_reach = bpy.data.materials.new(name="Reach_Mat")
-        mat_reach.use_nodes = True
-        bsdf = mat_reach.node_tree.nodes["Principled BSDF"]
-        bsdf.inputs["Base Color"].default_value = (0.0, 0.5, 1.0, 1.0) # Blueish
-        bsdf.inputs["Alpha"].default_value = 0.15
-        bsdf.inputs["Roughness"].default_value = 0.1
-        # Blender 4.2+ Eevee Next handles transparency differently (Raytraced)
-        # Old properties like blend_method and shadow_method are deprecated/removed
-        # mat_reach.blend_method = 'BLEND' 
-        # mat_reach.shadow_method = 'NONE'
-        
-    sphere.data.materials.append(mat_reach)
-    
-    # Smooth shade
-    bpy.ops.object.shade_smooth()
-    
-    return sphere
+    return reach_viz.add_reach_envelope(location, radius, "Reach_Mat", "Reach_Sphere")
 
 if __name__ == "__main__":
     # Create Tables
@@ -394,131 +147,10 @@ if __name__ == "__main__":
 def create_human_proxy(location, height=1.75, rotation_z=0):
     """
     Creates a blocky human figure with variable height and reach visualization.
-    Parts overlap to avoid gaps.
+    The body and reach sphere are shared per height class (see human_proxies.py);
+    for many people at once use human_proxies.place_human_proxies.
     """
-    ox, oy, oz = location
-    
-    # Proportional Dimensions
-    # Standard ratios based on height
-    head_size = height * 0.07
-    torso_height = height * 0.28
-    leg_height = height * 0.48
-    
-    # Widths/Depths (scaled slightly with height but not fully linear to keep proportions reasonable)
-    scale = height / 1.75
-    torso_width = 0.35 * scale
-    torso_depth = 0.2 * scale
-    limb_width = 0.1 * scale
-    arm_len = height * 0.38
-    
-    overlap = 0.03 # 3cm overlap to prevent gaps
-    
-    mat_human = bpy.data.materials.get("Human_Mat")
-    if not mat_human:
-        mat_human = bpy.data.materials.new(name="Human_Mat")
-        mat_human.diffuse_color = (0.8, 0.6, 0.4, 1) # Skin-ish
-        
-    mat_shirt = bpy.data.materials.get("Human_Shirt")
-    if not mat_shirt:
-        mat_shirt = bpy.data.materials.new(name="Human_Shirt")
-        mat_shirt.diffuse_color = (0.2, 0.2, 0.8, 1) # Blue shirt
-
-    mat_pants = bpy.data.materials.get("Human_Pants")
-    if not mat_pants:
-        mat_pants = bpy.data.materials.new(name="Human_Pants")
-        mat_pants.diffuse_color = (0.1, 0.1, 0.1, 1) # Dark pants
-
-    def create_part(name, size, loc, mat):
-        bpy.ops.mesh.primitive_cube_add(size=1, location=(0,0,0)) # Create at origin first
-        obj = bpy.context.active_object
-        obj.name = name
-        obj.scale = size
-        bpy.ops.object.transform_apply(scale=True)
-        obj.data.materials.append(mat)
-        obj.location = loc
-        return obj
-
-    # Legs
-    # Center of leg is at z = leg_height/2
-    # Add overlap to top of legs (into torso)
-    leg_z = oz + leg_height/2
-    leg_l = create_part("Leg_L", (limb_width, limb_width, leg_height + overlap), (ox - 0.1*scale, oy, leg_z), mat_pants)
-    leg_r = create_part("Leg_R", (limb_width, limb_width, leg_height + overlap), (ox + 0.1*scale, oy, leg_z), mat_pants)
-    
-    # Torso
-    # Starts at leg_height. Center is leg_height + torso_height/2
-    # Overlaps down into legs and up into head/arms
-    torso_z = oz + leg_height + torso_height/2
-    torso = create_part("Torso", (torso_width, torso_depth, torso_height + overlap), (ox, oy, torso_z), mat_shirt)
-    
-    # Head
-    # Center is at top of torso + radius
-    # Overlap is handled by sphere penetrating torso
-    head_z = oz + leg_height + torso_height + head_size - overlap
-    bpy.ops.mesh.primitive_uv_sphere_add(radius=head_size, location=(ox, oy, head_z))
-    head = bpy.context.active_object
-    head.name = "Head"
-    head.data.materials.append(mat_human)
-    
-    # Arms (Resting at sides)
-    # Shoulder height
-    shoulder_z = oz + leg_height + torso_height - (0.05 * scale)
-    arm_z = shoulder_z - arm_len/2
-    
-    arm_l = create_part("Arm_L", (limb_width, limb_width, arm_len), (ox - torso_width/2 - limb_width/2 + overlap, oy, arm_z), mat_shirt)
-    arm_r = create_part("Arm_R", (limb_width, limb_width, arm_len), (ox + torso_width/2 + limb_width/2 - overlap, oy, arm_z), mat_shirt)
-    
-    # Join Body
-    bpy.ops.object.select_all(action='DESELECT')
-    for obj in [leg_l, leg_r, torso, head, arm_l, arm_r]:
-        obj.select_set(True)
-    bpy.context.view_layer.objects.active = torso
-    bpy.ops.object.join()
-    human = bpy.context.active_object
-    human.name = f"Human_Proxy_{height}m"
-    
-    # Apply Rotation
-    human.rotation_euler = (0, 0, rotation_z)
-    
-    # Reach Sphere (Human)
-    # Radius ~0.8m, centered at shoulder height
-    # Adjust reach radius slightly with height?
-    reach_radius = 0.8 * scale
-    # Reach location needs to be rotated too!
-    # Default reach is forward (+Y relative to human?)
-    # Wait, create_human_proxy builds along X/Y axes assuming facing Y?
-    # No, torso width is X, depth is Y. So facing Y (or -Y).
-    # Reach loc was (ox, oy + 0.3, shoulder_z). This implies facing +Y.
-    
-    # We need to calculate the rotated reach location.
-    # Relative offset: (0, 0.3, 0)
-    # Rotate this offset by rotation_z
-    
-    rel_x = 0
-    rel_y = 0.3
-    
-    rot_x = rel_x * math.cos(rotation_z) - rel_y * math.sin(rotation_z)
-    rot_y = rel_x * math.sin(rotation_z) + rel_y * math.cos(rotation_z)
-    
-    reach_loc = (ox + rot_x, oy + rot_y, shoulder_z)
-    
-    bpy.ops.mesh.primitive_uv_sphere_add(radius=reach_radius, location=reach_loc)
-    sphere = bpy.context.active_object
-    sphere.name = f"Human_Reach_Sphere_{height}m"
-    
-    mat_reach = bpy.data.materials.get("Human_Reach_Mat")
-    if not mat_reach:
-        mat_reach = bpy.data.materials.new(name="Human_Reach_Mat")
-        mat_reach.use_nodes = True
-        bsdf = mat_reach.node_tree.nodes["Principled BSDF"]
-        bsdf.inputs["Base Color"].default_value = (1.0, 0.5, 0.0, 1.0) # Orange
-        bsdf.inputs["Alpha"].default_value = 0.15
-        bsdf.inputs["Roughness"].default_value = 0.1
-        
-    sphere.data.materials.append(mat_reach)
-    bpy.ops.object.shade_smooth()
-    
-    return human
+    return human_proxies.place_human_proxy(location, height=height, rotation_z=rotation_z)
 
 def create_workcell(origin_offset, cell_index, config="mixed"):
     """
@@ -567,14 +199,9 @@ def create_workcell(origin_offset, cell_index, config="mixed"):
         gz = oz
         
         # Table Top
-        bpy.ops.mesh.primitive_cube_add(
-            size=1, 
-            location=(gx, gy, gz + leg_height + table_thickness / 2)
-        )
-        table_top = bpy.context.active_object
-        table_top.name = f"TableTop_{cell_index}_{name_suffix}"
-        table_top.scale = (width, depth, table_thickness)
-        bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
+        name = f"TableTop_{cell_index}_{name_suffix}"
+        table_top = new_mesh_object(name, box_mesh(name, (width, depth, table_thickness)),
+                                    (gx, gy, gz + leg_height + table_thickness / 2))
         
         # Legs
         leg_off_x = (width / 2) - 0.1
@@ -588,13 +215,8 @@ def create_workcell(origin_offset, cell_index, config="mixed"):
         ]
         
         for i, (lx, ly) in enumerate(leg_positions):
-            bpy.ops.mesh.primitive_cylinder_add(
-                radius=leg_radius, 
-                depth=leg_height, 
-                location=(lx, ly, gz + leg_height / 2)
-            )
-            leg = bpy.context.active_object
-            leg.name = f"Leg_{cell_index}_{name_suffix}_{i+1}"
+            name = f"Leg_{cell_index}_{name_suffix}_{i+1}"
+            new_mesh_object(name, cylinder_mesh(name, leg_radius, leg_height), (lx, ly, gz + leg_height / 2))
             
         # Holes (Visual)
         hole_radius = 0.003
@@ -608,20 +230,11 @@ def create_workcell(origin_offset, cell_index, config="mixed"):
         start_x = gx + start_x_local
         start_y = gy + start_y_local
         
-        bpy.ops.mesh.primitive_cylinder_add(
-            radius=hole_radius,
-            depth=hole_depth,
-            location=(start_x, start_y, gz + leg_height + table_thickness - (hole_depth/2) + 0.0001) 
-        )
-        hole_obj = bpy.context.active_object
-        hole_obj.name = f"Hole_Grid_{cell_index}_{name_suffix}"
+        name = f"Hole_Grid_{cell_index}_{name_suffix}"
+        hole_obj = new_mesh_object(name, cylinder_mesh(name, hole_radius, hole_depth),
+                                   (start_x, start_y, gz + leg_height + table_thickness - (hole_depth/2) + 0.0001))
         
-        mat_hole = bpy.data.materials.get("Hole_Mat")
-        if not mat_hole:
-            mat_hole = bpy.data.materials.new(name="Hole_Mat")
-            mat_hole.diffuse_color = (0.0, 0.0, 0.0, 1)
-            mat_hole.roughness = 1.0
-            mat_hole.specular_intensity = 0.0
+        mat_hole = get_material("Hole_Mat")
         hole_obj.data.materials.append(mat_hole)
         
         count_x = int((width - 0.1) / hole_spacing)
@@ -639,12 +252,7 @@ def create_workcell(origin_offset, cell_index, config="mixed"):
         mod_y.use_constant_offset = True
         mod_y.constant_offset_displace = (0, hole_spacing, 0)
         
-        mat_table = bpy.data.materials.get("Table_Mat")
-        if not mat_table:
-            mat_table = bpy.data.materials.new(name="Table_Mat")
-            mat_table.diffuse_color = (0.8, 0.8, 0.8, 1)
-            mat_table.roughness = 0.4
-            mat_table.metallic = 0.8
+        mat_table = get_material("Table_Mat")
         table_top.data.materials.append(mat_table)
         
         return leg_height + table_thickness
@@ -684,15 +292,9 @@ def create_workcell(origin_offset, cell_index, config="mixed"):
     drop_len = 0.5
     
     def create_strut(name, loc):
-        bpy.ops.mesh.primitive_cube_add(size=1, location=(0,0,0))
-        obj = bpy.context.active_object
-        obj.name = name
-        obj.scale = (0.08, 0.08, drop_len)
-        bpy.ops.object.transform_apply(scale=True)
-        obj.location = (loc[0], loc[1], loc[2] - drop_len/2)
-        mat = bpy.data.materials.get("Rexroth_Alum")
-        if mat: obj.data.materials.append(mat)
-        return obj
+        mat = get_material("Rexroth_Alum")
+        return new_mesh_object(name, box_mesh(name, (0.08, 0.08, drop_len)),
+                               (loc[0], loc[1], loc[2] - drop_len/2), material=mat)
     
     # Suspended Z (bottom of beam)
     susp_z = gantry_h - 0.04 
@@ -776,9 +378,13 @@ def create_workcell(origin_offset, cell_index, config="mixed"):
 
 def create_optics_table():
     # 1. Clear existing objects
-    bpy.ops.object.select_all(action='SELECT')
-    bpy.ops.object.delete()
+    clear_scene()
     
+    # Everything below is built in one session: one view-layer update at the end
+    with build_session():
+        build_layout()
+
+def build_layout():
     # Create Workcell 1 (Mixed Config)
     # Offset X = -2.5 (Left side)
     create_workcell((-2.5, 0, 0), 1, config="mixed")
@@ -828,13 +434,39 @@ def create_optics_table():
     # Location: -4.70
     create_human_proxy((-4.70, 0, 0), height=1.70, rotation_z=math.pi/2)
 
-if __name__ == "__main__":
+def build_and_save(output_path="optics_table.blend", compress=False, reach_mode=None, check_gantry=False):
+    """
+    Builds the layout and saves it (materials de-duplicated, orphans purged).
+    output_path=None only builds.
+    check_gantry=True runs the beam deflection estimate and colours the
+    gantry profiles by load (see gantry_load.py).
+    reach_mode=None uses reach_viz.DEFAULT_REACH_MODE.
+    """
+    # Always set: a warm worker would otherwise keep the previous build's mode
+    reach_viz.set_reach_mode(reach_mode or reach_viz.DEFAULT_REACH_MODE)
+    
     create_optics_table()
     
-    # Save
-    output_path = os.path.abspath("optics_table.blend")
-    bpy.ops.wm.save_as_mainfile(filepath=output_path)
-    print(f"Saved to {output_path}")
-
+    if check_gantry:
+        gantry_load.print_report(gantry_load.check_scene(color=True))
+    
+    if output_path:
+        output_path = os.path.abspath(output_path)
+        save_blend(output_path, compress=compress)
+        print(f"Saved to {output_path}")
+    return output_path
 
+def parse_args(argv):
+    argv = script_argv(argv)
+    parser = argparse.ArgumentParser(description="Build and save the optics table workcells")
+    parser.add_argument("--output", default="optics_table.blend")
+    parser.add_argument("--compress", action="store_true", help="Write a compressed .blend")
+    parser.add_argument("--reach-mode", choices=reach_viz.REACH_MODES,
+                        help=f"How reach envelopes are drawn (default {reach_viz.DEFAULT_REACH_MODE})")
+    parser.add_argument("--check-gantry", action="store_true", help="Run the gantry load estimate and colour profiles by load")
+    return parser.parse_args(argv)
 
+if __name__ == "__main__":
+    # blender -b -P create_optics_table.py -- --compress --reach-mode points --check-gantry
+    args = parse_args(sys.argv)
+    build_and_save(args.output, compress=args.compress, reach_mode=args.reach_mode, check_gantry=args.check_gantry)
@@ -1,28 +1,244 @@
 import bpy
 import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+# Blender doesn't put the script's folder on sys.path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from scene_build import mesh_to_numpy
+from script_args import script_argv
+
+# Default location of the robot meshes (relative to the working directory,
+# like the other scripts in this folder)
+MESH_ROOT = "franka_description/meshes"
+MESH_EXTENSIONS = (".dae",)
+
+# Anomaly thresholds
+# DAE files from franka_description are authored in mm with a 0.001 scale,
+# so anything else (or a non-uniform scale) is worth flagging.
+EXPECTED_SCALES = (1.0, 0.001)
+MAX_OFFSET = 0.5        # m, origin further than this from the link frame
+MAX_DIMENSION = 1.0     # m, a single Franka link is never this large
+MIN_DIMENSION = 0.001   # m, probably a unit error
+WELD_TOLERANCE = 1e-6   # m, vertices closer than this count as duplicates
+DEGENERATE_AREA = 1e-12 # m^2
+
+
+def import_collada(file_path):
+    """
+    Imports a DAE file with the built-in COLLADA operator.
+    Returns the list of imported objects.
+    """
+    bpy.ops.object.select_all(action='DESELECT')
+    bpy.ops.wm.collada_import(filepath=file_path)
+    return list(bpy.context.selected_objects)
+
+
+# Loaders that can be benchmarked against each other.
+# Each takes a file path and returns the newly created objects.
+LOADERS = {
+    "collada": import_collada,
+}
+
+
+def find_meshes(mesh_root):
+    """
+    Returns all mesh files under mesh_root, sorted for stable output.
+    """
+    paths = []
+    for dirpath, _dirnames, filenames in os.walk(mesh_root):
+        for filename in filenames:
+            if filename.lower().endswith(MESH_EXTENSIONS):
+                paths.append(os.path.join(dirpath, filename))
+    return sorted(paths)
+
+
+def clear_objects(objects):
+    """
+    Removes imported objects together with their mesh, material and image data,
+    so repeated imports don't pile up datablocks (and skew memory / timing).
+    """
+    meshes = {obj.data for obj in objects if obj.type == 'MESH'}
+    materials = set()
+    for mesh in meshes:
+        materials.update(m for m in mesh.materials if m)
+
+    for obj in objects:
+        bpy.data.objects.remove(obj, do_unlink=True)
+    for mesh in meshes:
+        if mesh.users == 0:
+            bpy.data.meshes.remove(mesh)
+    for mat in materials:
+        if mat.users == 0:
+            bpy.data.materials.remove(mat)
+    for image in list(bpy.data.images):
+        if image.users == 0:
+            bpy.data.images.remove(image)
+
+
+def mesh_memory_bytes(mesh):
+    """
+    Rough in-memory footprint of a mesh's core arrays
+    (float3 positions, int2 edges, int corner verts/edges, int2 face offsets).
+    """
+    return (len(mesh.vertices) * 12
+            + len(mesh.edges) * 8
+            + len(mesh.loops) * 8
+            + len(mesh.polygons) * 8)
+
+
+def count_duplicate_vertices(co, tolerance=WELD_TOLERANCE):
+    if len(co) == 0:
+        return 0
+    keys = np.round(co / tolerance).astype(np.int64)
+    return len(co) - len(np.unique(keys, axis=0))
+
+
+def count_degenerate_faces(co, tris, min_area=DEGENERATE_AREA):
+    if len(tris) == 0:
+        return 0
+    a = co[tris[:, 0]]
+    b = co[tris[:, 1]]
+    c = co[tris[:, 2]]
+    area = 0.5 * np.linalg.norm(np.cross(b - a, c - a), axis=1)
+    return int(np.count_nonzero(area < min_area))
+
+
+def find_anomalies(obj):
+    """
+    Flags scale/offset problems on an imported object.
+    """
+    anomalies = []
+    scale = tuple(obj.scale)
+    if max(scale) - min(scale) > 1e-9:
+        anomalies.append(f"non-uniform scale {scale}")
+    elif not any(abs(scale[0] - s) < 1e-9 for s in EXPECTED_SCALES):
+        anomalies.append(f"unexpected scale {scale[0]:g}")
+
+    offset = obj.matrix_world.translation.length
+    if offset > MAX_OFFSET:
+        anomalies.append(f"origin offset {offset:.3f}m")
+
+    dims = tuple(obj.dimensions)
+    if max(dims) > MAX_DIMENSION:
+        anomalies.append(f"large dimensions {max(dims):.3f}m")
+    elif max(dims) < MIN_DIMENSION:
+        anomalies.append(f"tiny dimensions {max(dims):.6f}m")
+    return anomalies
+
+
+def diagnose_mesh(file_path, loader="collada", repeat=1):
+    """
+    Imports one mesh file `repeat` times and returns a dict of diagnostics.
+    Geometry statistics come from the last import.
+    """
+    load = LOADERS[loader]
+    times = []
+    objects = []
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        objects = load(file_path)
+        times.append(time.perf_counter() - t0)
+        if i < repeat - 1:
+            clear_objects(objects)
+
+    result = {
+        "file": file_path,
+        "loader": loader,
+        "file_bytes": os.path.getsize(file_path),
+        "import_s": float(np.median(times)),
+        "import_s_all": times,
+        "objects": len(objects),
+        "vertices": 0,
+        "faces": 0,
+        "triangles": 0,
+        "memory_bytes": 0,
+        "duplicate_vertices": 0,
+        "degenerate_faces": 0,
+        "materials": 0,
+        "anomalies": [],
+    }
+
+    bpy.context.view_layer.update()
+    materials = set()
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        mesh = obj.data
+        co, tris = mesh_to_numpy(mesh, obj.matrix_world)
+        result["vertices"] += len(mesh.vertices)
+        result["faces"] += len(mesh.polygons)
+        result["triangles"] += len(tris)
+        result["memory_bytes"] += mesh_memory_bytes(mesh)
+        result["duplicate_vertices"] += count_duplicate_vertices(co)
+        result["degenerate_faces"] += count_degenerate_faces(co, tris)
+        materials.update(m.name for m in mesh.materials if m)
+        result["anomalies"].extend(f"{obj.name}: {a}" for a in find_anomalies(obj))
+    result["materials"] = len(materials)
+
+    clear_objects(objects)
+    return result
+
+
+def print_table(results):
+    header = f"{'Mesh':<40} {'Import ms':>10} {'Verts':>8} {'Faces':>8} {'Mem KB':>8} {'Dup V':>7} {'Degen':>6}  Anomalies"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        name = os.path.relpath(r["file"], r.get("root", "."))
+        print(f"{name:<40} {r['import_s'] * 1000:>10.1f} {r['vertices']:>8} {r['faces']:>8} "
+              f"{r['memory_bytes'] / 1024:>8.1f} {r['duplicate_vertices']:>7} {r['degenerate_faces']:>6}  "
+              f"{'; '.join(r['anomalies']) or '-'}")
+    print("-" * len(header))
+    total_s = sum(r["import_s"] for r in results)
+    total_v = sum(r["vertices"] for r in results)
+    print(f"{len(results)} meshes, {total_v} vertices, {total_s * 1000:.1f} ms total import")
+
+
+def parse_args(argv):
+    argv = script_argv(argv)
+    parser = argparse.ArgumentParser(description="Import diagnostics for robot meshes")
+    parser.add_argument("--mesh-root", default=MESH_ROOT)
+    parser.add_argument("--loader", default="collada", choices=sorted(LOADERS))
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Benchmark mode: import each mesh N times and report the median")
+    parser.add_argument("--json", default="mesh_diagnostics.json")
+    parser.add_argument("--filter", default="", help="Only meshes whose path contains this string")
+    return parser.parse_args(argv)
+
+
+def debug_import(argv=None):
+    args = parse_args(sys.argv if argv is None else argv)
 
-def debug_import():
     # Clear scene
     bpy.ops.object.select_all(action='SELECT')
     bpy.ops.object.delete()
-    
-    # Path to link1
-    file_path = os.path.abspath("franka_description/meshes/robot_arms/fr3/visual/link1.dae")
-    
-    print(f"Importing {file_path}")
-    bpy.ops.wm.collada_import(filepath=file_path)
-    
-    print("Imported Objects:")
-    for obj in bpy.context.selected_objects:
-        print(f"  Name: {obj.name}")
-        print(f"  Type: {obj.type}")
-        print(f"  Parent: {obj.parent.name if obj.parent else 'None'}")
-        print(f"  Location: {obj.location}")
-        print(f"  Dimensions: {obj.dimensions}")
-        print(f"  Scale: {obj.scale}")
-        if obj.type == 'MESH':
-            print(f"  Vertices: {len(obj.data.vertices)}")
-        print("-" * 10)
+
+    mesh_root = os.path.abspath(args.mesh_root)
+    paths = [p for p in find_meshes(mesh_root) if args.filter in p]
+    if not paths:
+        print(f"No meshes found under {mesh_root}")
+        return []
+
+    results = []
+    for path in paths:
+        print(f"Importing {path}")
+        r = diagnose_mesh(path, loader=args.loader, repeat=max(1, args.repeat))
+        r["root"] = mesh_root
+        results.append(r)
+
+    print_table(results)
+
+    json_path = os.path.abspath(args.json)
+    with open(json_path, "w") as f:
+        json.dump({"mesh_root": mesh_root, "loader": args.loader,
+                   "repeat": args.repeat, "meshes": results}, f, indent=2)
+    print(f"Wrote {json_path}")
+    return results
 
 if __name__ == "__main__":
     debug_import()
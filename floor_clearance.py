@@ -0,0 +1,399 @@
+"""
+Floor clearance heatmap.
+
+Rasterizes the floor footprints of the robot reach envelopes and gantry legs
+onto a fine grid and runs a Euclidean distance transform over it, giving every
+cell its clearance (m) to the nearest envelope and the nearest leg. Aisles are
+found from the gaps between the table tops and summarized separately.
+
+    blender -b optics_table.blend -P floor_clearance.py -- --cell 0.02 --overlay
+
+writes floor_clearance.npz (maps + obstacles) and floor_clearance.png.
+Without Blender, a saved .npz can be re-gridded:
+
+    python floor_clearance.py --from floor_clearance.npz --cell 0.01
+"""
+import os
+import sys
+import argparse
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:
+    # Plain Python: only --from works
+    bpy = None
+
+try:
+    from scipy import ndimage
+except ImportError:
+    ndimage = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from script_args import script_argv, need_blender
+
+CELL_SIZE = 0.02
+MARGIN = 1.0
+# Clearances beyond this are reported as this (also bounds the NumPy fallback)
+MAX_CLEARANCE = 3.0
+# Height band a person occupies; envelopes are sliced to it before projecting
+HUMAN_BAND = (0.0, 2.0)
+# Clearance below this is flagged in the aisle report
+MIN_AISLE_CLEARANCE = 0.5
+
+REACH_PREFIX = "Reach_Sphere"
+REACH_POINTS = "Reach_Points_Reach_Mat"
+LEG_PREFIX = "Gantry_Leg_"
+TABLE_PREFIX = "TableTop_"
+
+
+class FloorGrid:
+    """Cell (i, j) has its center at origin + (j + 0.5, i + 0.5) * cell_size."""
+    def __init__(self, origin, shape, cell_size):
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.shape = tuple(int(n) for n in shape)
+        self.cell_size = float(cell_size)
+
+    @property
+    def xs(self):
+        return self.origin[0] + (np.arange(self.shape[1]) + 0.5) * self.cell_size
+
+    @property
+    def ys(self):
+        return self.origin[1] + (np.arange(self.shape[0]) + 0.5) * self.cell_size
+
+    @property
+    def extent(self):
+        """(xmin, ymin, xmax, ymax)"""
+        size = np.array(self.shape[::-1]) * self.cell_size
+        return (*self.origin, *(self.origin + size))
+
+    def index_range(self, lo, hi, axis):
+        """Cell index slice covering [lo, hi] along x (axis=0) or y (axis=1)."""
+        n = self.shape[1 - axis]
+        start = int(np.floor((lo - self.origin[axis]) / self.cell_size))
+        stop = int(np.ceil((hi - self.origin[axis]) / self.cell_size))
+        return slice(max(start, 0), min(max(stop, 0), n))
+
+
+def grid_for_bounds(bounds, cell_size=CELL_SIZE, margin=MARGIN):
+    """bounds: (xmin, ymin, xmax, ymax)"""
+    xmin, ymin, xmax, ymax = bounds
+    origin = (xmin - margin, ymin - margin)
+    nx = int(np.ceil((xmax - xmin + 2 * margin) / cell_size))
+    ny = int(np.ceil((ymax - ymin + 2 * margin) / cell_size))
+    return FloorGrid(origin, (ny, nx), cell_size)
+
+
+def footprint_radii(centers, radii, band=HUMAN_BAND):
+    """
+    Radius of each sphere's floor footprint within the height band
+    (full radius if the center is inside the band, smaller if above/below).
+    """
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+    radii = np.broadcast_to(np.asarray(radii, dtype=np.float64), (len(centers),))
+    dz = np.maximum.reduce([band[0] - centers[:, 2], centers[:, 2] - band[1], np.zeros(len(centers))])
+    return np.sqrt(np.maximum(radii ** 2 - dz ** 2, 0.0))
+
+
+def rasterize_disks(grid, centers_xy, radii):
+    """Boolean mask of cells whose center lies inside any disk."""
+    mask = np.zeros(grid.shape, dtype=bool)
+    xs, ys = grid.xs, grid.ys
+    for (cx, cy), r in zip(np.asarray(centers_xy).reshape(-1, 2), np.ravel(radii)):
+        if r <= 0:
+            continue
+        cols = grid.index_range(cx - r, cx + r, 0)
+        rows = grid.index_range(cy - r, cy + r, 1)
+        dx = xs[cols][None, :] - cx
+        dy = ys[rows][:, None] - cy
+        mask[rows, cols] |= dx * dx + dy * dy <= r * r
+    return mask
+
+
+def rasterize_boxes(grid, boxes):
+    """boxes: (N, 4) of xmin, ymin, xmax, ymax. Cells touched by a box are set."""
+    mask = np.zeros(grid.shape, dtype=bool)
+    for xmin, ymin, xmax, ymax in np.asarray(boxes).reshape(-1, 4):
+        mask[grid.index_range(ymin, ymax, 1), grid.index_range(xmin, xmax, 0)] = True
+    return mask
+
+
+def _min_plus_shift(f, axis, max_shift):
+    """out[x] = min over |k| <= max_shift of f[x + k] + k^2, along one axis."""
+    f = np.moveaxis(f, axis, -1)
+    out = f.copy()
+    for k in range(1, min(max_shift, f.shape[-1] - 1) + 1):
+        k2 = float(k * k)
+        np.minimum(out[..., k:], f[..., :-k] + k2, out=out[..., k:])
+        np.minimum(out[..., :-k], f[..., k:] + k2, out=out[..., :-k])
+    return np.moveaxis(out, -1, axis)
+
+
+def distance_transform(mask, cell_size, max_distance=MAX_CLEARANCE):
+    """
+    Distance (m) from every cell to the nearest True cell, capped at max_distance.
+    Uses scipy when available; otherwise a separable NumPy transform over
+    shifts up to max_distance (exact below the cap).
+    """
+    if not mask.any():
+        return np.full(mask.shape, max_distance, dtype=np.float32)
+    if ndimage is not None:
+        dist = ndimage.distance_transform_edt(~mask, sampling=cell_size)
+    else:
+        max_shift = int(np.ceil(max_distance / cell_size))
+        f = np.where(mask, 0.0, np.inf).astype(np.float32)
+        f = _min_plus_shift(f, 1, max_shift)
+        f = _min_plus_shift(f, 0, max_shift)
+        dist = np.sqrt(f) * cell_size
+    return np.minimum(dist, max_distance).astype(np.float32)
+
+
+def table_rows(tables):
+    """Groups table boxes into rows: chains of boxes whose y ranges overlap or touch."""
+    tables = np.asarray(tables, dtype=np.float64).reshape(-1, 4)
+    rows = []
+    ymax = -np.inf
+    for box in tables[np.argsort(tables[:, 1])]:
+        if rows and box[1] <= ymax + 1e-6:
+            rows[-1].append(box)
+            ymax = max(ymax, box[3])
+        else:
+            rows.append([box])
+            ymax = box[3]
+    return [np.array(row) for row in rows]
+
+
+def find_aisles(tables):
+    """
+    Gaps along X between table tops in the same row: returns (N, 4)
+    xmin, ymin, xmax, ymax. The y range is the overlap of the two tables
+    either side.
+    """
+    aisles = []
+    for row in table_rows(tables):
+        row = row[np.argsort(row[:, 0])]
+        # Merge overlapping x intervals, tracking the y span of each run
+        run = row[0].copy()
+        for box in row[1:]:
+            if box[0] <= run[2] + 1e-6:
+                run = np.array([run[0], min(run[1], box[1]), max(run[2], box[2]), max(run[3], box[3])])
+                continue
+            ymin, ymax = max(run[1], box[1]), min(run[3], box[3])
+            if ymax > ymin:
+                aisles.append((run[2], ymin, box[0], ymax))
+            run = box.copy()
+    return np.array(aisles).reshape(-1, 4)
+
+
+def clearance_map(envelopes, legs, tables=None, cell_size=CELL_SIZE, band=HUMAN_BAND,
+                  max_clearance=MAX_CLEARANCE, margin=MARGIN):
+    """
+    envelopes: (N, 4) x, y, z, radius of reach spheres
+    legs, tables: (M, 4) floor boxes xmin, ymin, xmax, ymax
+    Returns a dict with the grid, the per-obstacle clearance maps, their
+    minimum ("clearance") and the obstacle masks.
+    """
+    envelopes = np.asarray(envelopes, dtype=np.float64).reshape(-1, 4)
+    legs = np.asarray(legs, dtype=np.float64).reshape(-1, 4)
+    tables = np.zeros((0, 4)) if tables is None else np.asarray(tables, dtype=np.float64).reshape(-1, 4)
+
+    radii = footprint_radii(envelopes[:, :3], envelopes[:, 3], band)
+    extents = [np.column_stack([envelopes[:, :2] - radii[:, None], envelopes[:, :2] + radii[:, None]]), legs, tables]
+    extents = [e for e in extents if len(e)]
+    if extents:
+        extents = np.concatenate(extents)
+        bounds = (*extents[:, :2].min(axis=0), *extents[:, 2:].max(axis=0))
+    else:
+        # Nothing on the floor: a margin-sized grid, clear everywhere
+        bounds = (0.0, 0.0, 0.0, 0.0)
+    grid = grid_for_bounds(bounds, cell_size, margin)
+
+    envelope_mask = rasterize_disks(grid, envelopes[:, :2], radii)
+    leg_mask = rasterize_boxes(grid, legs)
+    to_envelopes = distance_transform(envelope_mask, cell_size, max_clearance)
+    to_legs = distance_transform(leg_mask, cell_size, max_clearance)
+    return {
+        "grid": grid,
+        "envelopes": to_envelopes,
+        "legs": to_legs,
+        "clearance": np.minimum(to_envelopes, to_legs),
+        "envelope_mask": envelope_mask,
+        "leg_mask": leg_mask,
+        "table_mask": rasterize_boxes(grid, tables),
+        "aisles": find_aisles(tables),
+    }
+
+
+def aisle_report(result, threshold=MIN_AISLE_CLEARANCE):
+    """Per aisle: width and clearance stats over the aisle's cells."""
+    grid = result["grid"]
+    report = []
+    for xmin, ymin, xmax, ymax in result["aisles"]:
+        rows = grid.index_range(ymin, ymax, 1)
+        cols = grid.index_range(xmin, xmax, 0)
+        cells = result["clearance"][rows, cols]
+        if cells.size == 0:
+            continue
+        report.append({
+            "x": ((xmin + xmax) / 2),
+            "width": xmax - xmin,
+            "min_clearance": float(cells.min()),
+            "min_to_envelope": float(result["envelopes"][rows, cols].min()),
+            "min_to_leg": float(result["legs"][rows, cols].min()),
+            "blocked_fraction": float((cells < threshold).mean()),
+        })
+    return report
+
+
+def print_report(result, report):
+    grid = result["grid"]
+    print(f"Grid {grid.shape[1]} x {grid.shape[0]} cells of {grid.cell_size * 1000:.0f} mm, extent {np.round(grid.extent, 2)}")
+    print(f"{'Aisle x':>8} {'Width':>6} {'Min':>6} {'Env':>6} {'Leg':>6} {'<' + str(MIN_AISLE_CLEARANCE):>6}")
+    for a in report:
+        print(f"{a['x']:8.2f} {a['width']:6.2f} {a['min_clearance']:6.2f} {a['min_to_envelope']:6.2f} "
+              f"{a['min_to_leg']:6.2f} {a['blocked_fraction'] * 100:5.0f}%")
+
+
+def colorize(result, max_clearance=MAX_CLEARANCE):
+    """
+    RGB uint8 image, north (+Y) up: red (no clearance) -> yellow -> green,
+    envelopes tinted blue, tables grey, legs black.
+    """
+    t = np.clip(result["clearance"] / max_clearance, 0.0, 1.0)
+    stops = [0.0, 0.5, 1.0]
+    rgb = np.stack([
+        np.interp(t, stops, [1.0, 1.0, 0.1]),
+        np.interp(t, stops, [0.1, 0.9, 0.7]),
+        np.interp(t, stops, [0.1, 0.1, 0.2]),
+    ], axis=-1)
+    rgb[result["table_mask"]] = rgb[result["table_mask"]] * 0.5 + 0.35
+    rgb[result["envelope_mask"]] = rgb[result["envelope_mask"]] * 0.4 + np.array([0.0, 0.3, 0.6])
+    rgb[result["leg_mask"]] = 0.0
+    return np.flipud(np.round(rgb * 255).astype(np.uint8))
+
+
+def save_png(path, rgb):
+    from tiled_render import PNGStreamWriter
+    writer = PNGStreamWriter(path, rgb.shape[1], rgb.shape[0], channels=3)
+    writer.write_rows(rgb)
+    writer.close()
+    return path
+
+
+def save_result(path, result, obstacles):
+    grid = result["grid"]
+    np.savez_compressed(
+        path, clearance=result["clearance"], to_envelopes=result["envelopes"], to_legs=result["legs"],
+        origin=grid.origin, cell_size=grid.cell_size, aisles=result["aisles"], **obstacles,
+    )
+    return path
+
+
+# --- Blender side ---
+
+def _floor_box(obj):
+    """Floor-plane (xmin, ymin, xmax, ymax) of an object's world bounding box."""
+    from scene_diff import world_bbox
+    xmin, ymin, _zmin, xmax, ymax, _zmax = world_bbox(obj)
+    return (xmin, ymin, xmax, ymax)
+
+
+def obstacles_from_scene():
+    """
+    Robot reach envelopes (any reach mode), gantry legs and table tops of the
+    current scene as arrays.
+    """
+    envelopes, legs, tables = [], [], []
+    for obj in bpy.context.scene.objects:
+        if obj.name.startswith(REACH_PREFIX):
+            center = obj.matrix_world.translation
+            envelopes.append((*center, max(obj.dimensions) / 2))
+        elif obj.name.startswith(REACH_POINTS) and obj.type == 'MESH':
+            mesh = obj.data
+            co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+            mesh.vertices.foreach_get("co", co)
+            radius = np.empty(len(mesh.vertices), dtype=np.float32)
+            mesh.attributes["radius"].data.foreach_get("value", radius)
+            co = co.reshape(-1, 3) @ np.array(obj.matrix_world)[:3, :3].T + np.array(obj.matrix_world)[:3, 3]
+            envelopes.extend(np.column_stack([co, radius]))
+        elif obj.name.startswith(LEG_PREFIX):
+            legs.append(_floor_box(obj))
+        elif obj.name.startswith(TABLE_PREFIX):
+            tables.append(_floor_box(obj))
+    return {
+        "envelopes": np.array(envelopes, dtype=np.float64).reshape(-1, 4),
+        "legs": np.array(legs, dtype=np.float64).reshape(-1, 4),
+        "tables": np.array(tables, dtype=np.float64).reshape(-1, 4),
+    }
+
+
+def add_overlay(grid, image_path, name="Floor_Clearance", height=0.002):
+    """Adds (or updates) a floor plane textured with the heatmap image."""
+    from scene_build import new_mesh_object
+
+    xmin, ymin, xmax, ymax = grid.extent
+    image = bpy.data.images.load(os.path.abspath(image_path), check_existing=True)
+    image.reload()
+
+    mat = bpy.data.materials.get(name) or bpy.data.materials.new(name)
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    tex = nodes.get("Clearance_Image") or nodes.new('ShaderNodeTexImage')
+    tex.name = "Clearance_Image"
+    tex.image = image
+    tex.interpolation = 'Closest'
+    mat.node_tree.links.new(tex.outputs["Color"], nodes["Principled BSDF"].inputs["Base Color"])
+
+    old = bpy.data.objects.get(name)
+    if old is not None:
+        bpy.data.objects.remove(old)
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata([(xmin, ymin, height), (xmax, ymin, height), (xmax, ymax, height), (xmin, ymax, height)],
+                     [], [(0, 1, 2, 3)])
+    uv = mesh.uv_layers.new(name="UVMap")
+    uv.data.foreach_set("uv", [0, 0, 1, 0, 1, 1, 0, 1])
+    return new_mesh_object(name, mesh, material=mat)
+
+
+def parse_args(argv):
+    argv = script_argv(argv)
+    parser = argparse.ArgumentParser(description="Floor clearance heatmap")
+    parser.add_argument("--cell", type=float, default=CELL_SIZE, help="Cell size in m")
+    parser.add_argument("--max-clearance", type=float, default=MAX_CLEARANCE)
+    parser.add_argument("--band", type=float, nargs=2, default=HUMAN_BAND, help="Height band in m")
+    parser.add_argument("--from", dest="source", help="Reuse the obstacles saved in this .npz")
+    parser.add_argument("--out", default="floor_clearance.npz")
+    parser.add_argument("--image", default="floor_clearance.png")
+    parser.add_argument("--overlay", action="store_true", help="Add the image as a floor plane to the scene")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv if argv is None else argv)
+
+    if args.source:
+        saved = np.load(args.source)
+        obstacles = {key: saved[key] for key in ("envelopes", "legs", "tables")}
+    elif bpy is not None:
+        obstacles = obstacles_from_scene()
+    else:
+        need_blender("--from <saved .npz>")
+    print(f"{len(obstacles['envelopes'])} reach envelopes, {len(obstacles['legs'])} gantry legs, "
+          f"{len(obstacles['tables'])} tables")
+
+    result = clearance_map(obstacles["envelopes"], obstacles["legs"], obstacles["tables"],
+                           cell_size=args.cell, band=tuple(args.band), max_clearance=args.max_clearance)
+    print_report(result, aisle_report(result))
+
+    save_result(args.out, result, obstacles)
+    save_png(args.image, colorize(result, args.max_clearance))
+    print(f"Saved {args.out} and {args.image}")
+
+    if args.overlay and bpy is not None:
+        add_overlay(result["grid"], args.image)
+    return result
+
+if __name__ == "__main__":
+    main()
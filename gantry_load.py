@@ -0,0 +1,389 @@
+"""
+Gantry load and deflection estimate.
+
+Builds a 3D frame (Euler-Bernoulli beam element) model from the generated
+gantry legs, beams and drop struts, hangs the suspended arms from the strut
+ends and solves K u = f (SciPy sparse if available, NumPy otherwise).
+Reports the deflection at every robot mount and the stress utilisation of
+every profile, and can colour the profiles by load in the scene.
+
+Members are read from the objects' world bounding boxes, so any layout built
+by create_optics_table.py works. Cheap enough (milliseconds) to run after
+every build:
+
+    blender -b optics_table.blend -P gantry_load.py -- --color
+    python gantry_load.py --from optics_table.snapshot.json   (see scene_diff.py)
+"""
+import os
+import re
+import sys
+import json
+import argparse
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:
+    # Plain Python: only --from works
+    bpy = None
+
+try:
+    from scipy import sparse
+    from scipy.sparse.linalg import spsolve
+except ImportError:
+    sparse = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from script_args import script_argv, need_blender
+
+GRAVITY = 9.81
+
+# 80x80 light aluminium profile (approximate catalogue values)
+PROFILE_SIZE = 0.08
+E_MODULUS = 70e9            # Pa
+G_MODULUS = 26e9            # Pa
+AREA = 17.2e-4              # m^2
+INERTIA = 95e-8             # m^4, same about both axes
+TORSION = 12e-8             # m^4
+LINEAR_MASS = 4.6           # kg/m
+ALLOWABLE_STRESS = 100e6    # Pa, ~half the alloy's yield strength
+
+# Suspended FR3 incl. hand, plus payload, scaled for accelerations
+ROBOT_MASS = 18.5
+PAYLOAD = 3.0
+DYNAMIC_FACTOR = 1.5
+
+# Mount deflection (m) above which a mount is flagged
+MOUNT_DEFLECTION_LIMIT = 0.5e-3
+# Member end points closer than this are joined
+CONNECT_TOL = 0.07
+# Longer spans are split so self-weight and deflection shapes are resolved
+MAX_ELEMENT = 0.25
+
+LEG = re.compile(r"^Gantry_Leg_")
+BEAM = re.compile(r"^Gantry_Beam_")
+STRUT = re.compile(r"^Strut_")
+
+# (fraction of ALLOWABLE_STRESS, material) - highest matching entry wins
+LOAD_MATERIALS = [(0.0, "Load_Low"), (0.25, "Load_Mid"), (0.5, "Load_High"), (1.0, "Load_Over")]
+
+
+def member_axis(box):
+    """Centerline (p0, p1) of an axis-aligned profile from its AABB."""
+    box = np.asarray(box, dtype=np.float64)
+    lo, hi = box[:3], box[3:]
+    axis = int(np.argmax(hi - lo))
+    center = (lo + hi) / 2
+    p0, p1 = center.copy(), center.copy()
+    p0[axis], p1[axis] = lo[axis], hi[axis]
+    return p0, p1
+
+
+def members_from_boxes(boxes):
+    """
+    boxes: {object name: AABB}. Returns a list of members
+    {"name", "kind" (leg/beam/strut), "p0", "p1"} with p0 the lower end.
+    """
+    members = []
+    for name, box in sorted(boxes.items()):
+        kind = "leg" if LEG.match(name) else "beam" if BEAM.match(name) else "strut" if STRUT.match(name) else None
+        if kind is None or box is None:
+            continue
+        p0, p1 = member_axis(box)
+        if p0[2] > p1[2]:
+            p0, p1 = p1, p0
+        members.append({"name": name, "kind": kind, "p0": p0, "p1": p1})
+    return members
+
+
+def _cluster(points, tol):
+    """Greedy clustering: returns (representatives (C, 3), label per point)."""
+    reps = []
+    labels = np.empty(len(points), dtype=np.int64)
+    for i, p in enumerate(points):
+        if reps:
+            d = np.linalg.norm(np.asarray(reps) - p, axis=1)
+            j = int(np.argmin(d))
+            if d[j] < tol:
+                labels[i] = j
+                continue
+        labels[i] = len(reps)
+        reps.append(p)
+    return np.asarray(reps).reshape(-1, 3), labels
+
+
+def build_model(members, tol=CONNECT_TOL, max_element=MAX_ELEMENT):
+    """
+    Joins members where an end point lies on (or at the end of) another
+    member and splits them into elements.
+    Returns {"nodes" (N, 3), "elements" (M, 2), "element_member" (M,),
+    "members", "mount_nodes" {strut name: node}, "support_nodes"}.
+    """
+    ends = np.array([p for m in members for p in (m["p0"], m["p1"])]).reshape(-1, 3)
+    joints, labels = _cluster(ends, tol)
+    nodes = [tuple(p) for p in joints]
+    elements, element_member = [], []
+
+    for k, member in enumerate(members):
+        p0, p1 = member["p0"], member["p1"]
+        length = np.linalg.norm(p1 - p0)
+        direction = (p1 - p0) / length
+        # Joints on this member's axis (its own ends and others attached along it)
+        rel = joints - p0
+        t = rel @ direction
+        perpendicular = np.linalg.norm(rel - np.outer(t, direction), axis=1)
+        on_axis = np.flatnonzero((perpendicular < tol) & (t > -tol) & (t < length + tol))
+        on_axis = on_axis[np.argsort(t[on_axis])]
+        if len(on_axis) < 2:
+            continue
+
+        chain = [int(on_axis[0])]
+        for node in on_axis[1:]:
+            a, b = np.asarray(nodes[chain[-1]]), joints[node]
+            span = np.linalg.norm(b - a)
+            if span < 1e-9:
+                continue
+            # Intermediate nodes for long spans
+            for s in range(1, int(np.ceil(span / max_element))):
+                nodes.append(tuple(a + (b - a) * s / np.ceil(span / max_element)))
+                chain.append(len(nodes) - 1)
+            chain.append(int(node))
+        for a, b in zip(chain[:-1], chain[1:]):
+            elements.append((a, b))
+            element_member.append(k)
+
+    nodes = np.asarray(nodes, dtype=np.float64)
+    legs = [m for m in members if m["kind"] == "leg"]
+    floor = min((m["p0"][2] for m in legs), default=nodes[:, 2].min())
+    return {
+        "nodes": nodes,
+        "elements": np.asarray(elements, dtype=np.int64).reshape(-1, 2),
+        "element_member": np.asarray(element_member, dtype=np.int64),
+        "members": members,
+        "mount_nodes": {m["name"]: int(labels[2 * k]) for k, m in enumerate(members) if m["kind"] == "strut"},
+        "support_nodes": np.flatnonzero(nodes[:, 2] < floor + tol),
+    }
+
+
+def _local_stiffness(length):
+    """12x12 frame element stiffness in local axes (x along the element)."""
+    L = length
+    EA, GJ = E_MODULUS * AREA / L, G_MODULUS * TORSION / L
+    EI = E_MODULUS * INERTIA
+    a, b, c, d = 12 * EI / L ** 3, 6 * EI / L ** 2, 4 * EI / L, 2 * EI / L
+    k = np.zeros((12, 12))
+    k[np.ix_([0, 6], [0, 6])] = [[EA, -EA], [-EA, EA]]
+    k[np.ix_([3, 9], [3, 9])] = [[GJ, -GJ], [-GJ, GJ]]
+    # Bending in the local xy plane (v, rz) and xz plane (w, ry)
+    k[np.ix_([1, 5, 7, 11], [1, 5, 7, 11])] = [[a, b, -a, b], [b, c, -b, d], [-a, -b, a, -b], [b, d, -b, c]]
+    k[np.ix_([2, 4, 8, 10], [2, 4, 8, 10])] = [[a, -b, -a, -b], [-b, c, b, d], [-a, b, a, b], [-b, d, b, c]]
+    return k
+
+
+def _rotation(p0, p1):
+    """12x12 transform from global to local element axes."""
+    x = (p1 - p0) / np.linalg.norm(p1 - p0)
+    ref = np.array([0.0, 1.0, 0.0]) if abs(x[2]) > 0.9 else np.array([0.0, 0.0, 1.0])
+    y = np.cross(ref, x)
+    y /= np.linalg.norm(y)
+    z = np.cross(x, y)
+    r = np.vstack([x, y, z])
+    return np.kron(np.eye(4), r)
+
+
+def solve(model, robot_mass=ROBOT_MASS, payload=PAYLOAD, dynamic_factor=DYNAMIC_FACTOR):
+    """
+    Gravity + suspended robots on every strut end. Returns node displacements
+    (N, 6) and per-element (axial force, max bending moment, stress).
+    """
+    nodes, elements = model["nodes"], model["elements"]
+    n_dof = len(nodes) * 6
+    force = np.zeros(n_dof)
+    rows, cols, vals = [], [], []
+    transforms, locals_ = [], []
+
+    for a, b in elements:
+        length = np.linalg.norm(nodes[b] - nodes[a])
+        k_local = _local_stiffness(length)
+        T = _rotation(nodes[a], nodes[b])
+        k_global = T.T @ k_local @ T
+        dofs = np.r_[a * 6:a * 6 + 6, b * 6:b * 6 + 6]
+        rows.append(np.repeat(dofs, 12))
+        cols.append(np.tile(dofs, 12))
+        vals.append(k_global.ravel())
+        transforms.append(T)
+        locals_.append(k_local)
+        # Self-weight, lumped to the element ends
+        weight = LINEAR_MASS * length * GRAVITY / 2
+        force[a * 6 + 2] -= weight
+        force[b * 6 + 2] -= weight
+
+    for node in model["mount_nodes"].values():
+        force[node * 6 + 2] -= (robot_mass + payload) * dynamic_factor * GRAVITY
+
+    # Fixed feet: drop their DOFs
+    fixed = np.zeros(n_dof, dtype=bool)
+    for node in model["support_nodes"]:
+        fixed[node * 6:node * 6 + 6] = True
+    free = np.flatnonzero(~fixed)
+
+    rows, cols, vals = np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
+    # Tiny stiffness on every DOF so a loose member shows up as a huge deflection, not a singular matrix
+    eps = 1e-9 * np.abs(vals).max()
+    displacement = np.zeros(n_dof)
+    if sparse is not None:
+        K = sparse.coo_matrix((vals, (rows, cols)), shape=(n_dof, n_dof)).tocsr()
+        K = K + sparse.identity(n_dof, format="csr") * eps
+        displacement[free] = spsolve(K[free][:, free].tocsc(), force[free])
+    else:
+        K = np.zeros((n_dof, n_dof))
+        np.add.at(K, (rows, cols), vals)
+        K[np.diag_indices(n_dof)] += eps
+        displacement[free] = np.linalg.solve(K[np.ix_(free, free)], force[free])
+
+    u = displacement.reshape(-1, 6)
+    forces = np.zeros((len(elements), 3))
+    c = PROFILE_SIZE / 2
+    for i, (a, b) in enumerate(elements):
+        f = locals_[i] @ (transforms[i] @ np.r_[u[a], u[b]])
+        axial = abs(f[0])
+        moment = max(abs(f[4]), abs(f[5]), abs(f[10]), abs(f[11]))
+        # Conservative: both bending axes at their peak on the same fibre
+        bending = max(abs(f[4]) + abs(f[5]), abs(f[10]) + abs(f[11]))
+        forces[i] = (axial, moment, axial / AREA + bending * c / INERTIA)
+    return u, forces
+
+
+def estimate(boxes, **loads):
+    """
+    boxes: {object name: AABB}. Returns a report dict with per-mount
+    deflections and per-member utilisation.
+    """
+    members = members_from_boxes(boxes)
+    if not members:
+        # No gantry in this layout (or nothing matched the name patterns)
+        return {"nodes": 0, "elements": 0, "mounts": [], "members": []}
+    model = build_model(members)
+    u, forces = solve(model, **loads)
+    members = model["members"]
+
+    mounts = []
+    for name, node in sorted(model["mount_nodes"].items()):
+        d = u[node, :3]
+        mounts.append({
+            "strut": name,
+            "location": [round(float(v), 4) for v in model["nodes"][node]],
+            "deflection_mm": [round(float(v) * 1000, 4) for v in d],
+            "total_mm": round(float(np.linalg.norm(d)) * 1000, 4),
+            "ok": bool(np.linalg.norm(d) <= MOUNT_DEFLECTION_LIMIT),
+        })
+
+    utilisation = []
+    for k, member in enumerate(members):
+        mask = model["element_member"] == k
+        if not mask.any():
+            continue
+        stress = float(forces[mask, 2].max())
+        nodes = np.unique(model["elements"][mask])
+        utilisation.append({
+            "name": member["name"],
+            "kind": member["kind"],
+            "max_stress_mpa": round(stress / 1e6, 3),
+            "max_moment_nm": round(float(forces[mask, 1].max()), 2),
+            "max_axial_n": round(float(forces[mask, 0].max()), 2),
+            "max_deflection_mm": round(float(np.linalg.norm(u[nodes, :3], axis=1).max()) * 1000, 4),
+            "load": round(stress / ALLOWABLE_STRESS, 4),
+        })
+    return {
+        "nodes": len(model["nodes"]),
+        "elements": len(model["elements"]),
+        "mounts": mounts,
+        "members": utilisation,
+    }
+
+
+def print_report(report):
+    if not report["elements"]:
+        print("No gantry profiles found, nothing to check")
+        return
+    print(f"Gantry model: {report['nodes']} nodes, {report['elements']} elements")
+    print(f"{'Mount':<16} {'dx':>8} {'dy':>8} {'dz':>8} {'|d| mm':>8}")
+    for mount in report["mounts"]:
+        dx, dy, dz = mount["deflection_mm"]
+        flag = "" if mount["ok"] else f"  > {MOUNT_DEFLECTION_LIMIT * 1000:.1f} mm"
+        print(f"{mount['strut']:<16} {dx:8.3f} {dy:8.3f} {dz:8.3f} {mount['total_mm']:8.3f}{flag}")
+    worst = sorted(report["members"], key=lambda m: -m["load"])[:5]
+    print("Most loaded profiles:")
+    for member in worst:
+        print(f"  {member['name']:<24} {member['max_stress_mpa']:7.2f} MPa ({member['load'] * 100:.0f}% of allowable), "
+              f"max deflection {member['max_deflection_mm']:.3f} mm")
+
+
+# --- Blender side ---
+
+def boxes_from_scene():
+    from scene_diff import world_bbox
+    return {
+        obj.name: world_bbox(obj)
+        for obj in bpy.context.scene.objects
+        if obj.type == 'MESH' and (LEG.match(obj.name) or BEAM.match(obj.name) or STRUT.match(obj.name))
+    }
+
+
+def color_by_load(report):
+    """
+    Overrides each profile's material (object-linked slot, so the shared
+    mesh material is untouched) with a Load_* material for its utilisation.
+    """
+    from materials import get_material
+    for member in report["members"]:
+        obj = bpy.data.objects.get(member["name"])
+        if obj is None or not obj.material_slots:
+            continue
+        name = [mat for threshold, mat in LOAD_MATERIALS if member["load"] >= threshold][-1]
+        slot = obj.material_slots[0]
+        slot.link = 'OBJECT'
+        slot.material = get_material(name)
+
+
+def check_scene(color=False, **loads):
+    """Runs the estimate on the current scene (e.g. right after a build)."""
+    report = estimate(boxes_from_scene(), **loads)
+    if color:
+        color_by_load(report)
+    return report
+
+
+def parse_args(argv):
+    argv = script_argv(argv)
+    parser = argparse.ArgumentParser(description="Gantry load and deflection estimate")
+    parser.add_argument("--from", dest="source", help="scene_diff.py snapshot .json instead of the open scene")
+    parser.add_argument("--robot-mass", type=float, default=ROBOT_MASS)
+    parser.add_argument("--payload", type=float, default=PAYLOAD)
+    parser.add_argument("--dynamic-factor", type=float, default=DYNAMIC_FACTOR)
+    parser.add_argument("--color", action="store_true", help="Colour profiles by load in the scene")
+    parser.add_argument("--json", help="Write the report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv if argv is None else argv)
+    loads = {"robot_mass": args.robot_mass, "payload": args.payload, "dynamic_factor": args.dynamic_factor}
+    if args.source:
+        with open(args.source) as f:
+            objects = json.load(f)["objects"]
+        report = estimate({name: record["bbox"] for name, record in objects.items()}, **loads)
+    elif bpy is not None:
+        report = check_scene(color=args.color, **loads)
+    else:
+        need_blender("--from <snapshot .json>")
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Human proxies for occupancy / crowd studies.
+
+The blocky body and its reach sphere are built once per height class as
+template meshes (origin at the feet, facing +Y). Placements reuse them:
+
+- place_human_proxy(): one linked-duplicate object per person (named like
+  the old create_human_proxy output)
+- place_human_proxies(): arrays of locations / heights / rotations, one point
+  object per height class instanced with Geometry Nodes, so thousands of
+  people cost a handful of objects.
+"""
+import bpy
+import math
+
+import numpy as np
+from mathutils import Matrix
+
+from materials import get_material
+from scene_build import (new_bmesh, mesh_from_bmesh, add_box, add_uv_sphere, new_mesh_object, uv_sphere_mesh,
+                         new_geometry_group, is_alive)
+import reach_viz
+
+# Heights are rounded to this step to pick a template; the rest is per-instance scale
+HEIGHT_CLASS_STEP = 0.1
+
+TEMPLATE_COLLECTION = "Human_Templates"
+
+# (height_class, part) -> mesh
+_TEMPLATES = {}
+
+
+def height_class(height, step=HEIGHT_CLASS_STEP):
+    return round(round(height / step) * step, 3)
+
+
+def body_dimensions(height):
+    """
+    Proportional Dimensions
+    Standard ratios based on height
+    """
+    scale = height / 1.75
+    return {
+        "scale": scale,
+        "head_size": height * 0.07,
+        "torso_height": height * 0.28,
+        "leg_height": height * 0.48,
+        # Widths/Depths (scaled slightly with height but not fully linear to keep proportions reasonable)
+        "torso_width": 0.35 * scale,
+        "torso_depth": 0.2 * scale,
+        "limb_width": 0.1 * scale,
+        "arm_len": height * 0.38,
+        "overlap": 0.03, # 3cm overlap to prevent gaps
+        # Shoulder height
+        "shoulder_z": height * 0.48 + height * 0.28 - (0.05 * scale),
+    }
+
+
+def build_body_mesh(height, name):
+    """
+    Blocky human figure as one mesh, origin at the feet, facing +Y.
+    Parts overlap to avoid gaps.
+    """
+    d = body_dimensions(height)
+    scale = d["scale"]
+    limb_width = d["limb_width"]
+    overlap = d["overlap"]
+
+    materials = [get_material("Human_Shirt"), get_material("Human_Pants"), get_material("Human_Mat")]
+    bm = new_bmesh()
+
+    def tag(verts, mat_index):
+        for face in {f for v in verts for f in v.link_faces}:
+            face.material_index = mat_index
+
+    # Legs
+    # Center of leg is at z = leg_height/2
+    # Add overlap to top of legs (into torso)
+    leg_z = d["leg_height"] / 2
+    leg_size = (limb_width, limb_width, d["leg_height"] + overlap)
+    tag(add_box(bm, leg_size, (-0.1 * scale, 0, leg_z)), 1)
+    tag(add_box(bm, leg_size, (0.1 * scale, 0, leg_z)), 1)
+
+    # Torso
+    # Starts at leg_height. Center is leg_height + torso_height/2
+    # Overlaps down into legs and up into head/arms
+    torso_z = d["leg_height"] + d["torso_height"] / 2
+    tag(add_box(bm, (d["torso_width"], d["torso_depth"], d["torso_height"] + overlap), (0, 0, torso_z)), 0)
+
+    # Head
+    # Center is at top of torso + radius
+    # Overlap is handled by sphere penetrating torso
+    head_z = d["leg_height"] + d["torso_height"] + d["head_size"] - overlap
+    tag(add_uv_sphere(bm, d["head_size"], (0, 0, head_z)), 2)
+
+    # Arms (Resting at sides)
+    arm_z = d["shoulder_z"] - d["arm_len"] / 2
+    arm_size = (limb_width, limb_width, d["arm_len"])
+    arm_x = d["torso_width"] / 2 + limb_width / 2 - overlap
+    tag(add_box(bm, arm_size, (-arm_x, 0, arm_z)), 0)
+    tag(add_box(bm, arm_size, (arm_x, 0, arm_z)), 0)
+
+    mesh = mesh_from_bmesh(bm, name)
+    for mat in materials:
+        mesh.materials.append(mat)
+    return mesh
+
+
+def reach_offset(height):
+    """
+    Reach Sphere (Human)
+    Radius ~0.8m (scaled with height), centered at shoulder height,
+    0.3m in front of the body (+Y). Returns (offset from the feet, radius).
+    """
+    d = body_dimensions(height)
+    return (0, 0.3, d["shoulder_z"]), 0.8 * d["scale"]
+
+
+def reach_envelopes(locations, heights, rotation_z):
+    """Vectorized reach-sphere centers and radii for many people."""
+    locations = np.asarray(locations, dtype=np.float64).reshape(-1, 3)
+    heights = np.broadcast_to(np.asarray(heights, dtype=np.float64), (len(locations),))
+    rotation_z = np.broadcast_to(np.asarray(rotation_z, dtype=np.float64), (len(locations),))
+    d = body_dimensions(heights)
+    # Rotate the forward offset (0, 0.3) by rotation_z
+    centers = locations + np.column_stack([-0.3 * np.sin(rotation_z), 0.3 * np.cos(rotation_z), d["shoulder_z"]])
+    return centers, 0.8 * d["scale"]
+
+
+def build_reach_mesh(height, name, low_poly=False):
+    """
+    Reach sphere as a mesh with its origin at the feet, like the body.
+    """
+    offset, radius = reach_offset(height)
+    if low_poly:
+        mesh = uv_sphere_mesh(name, radius, segments=reach_viz.LOW_POLY_SEGMENTS,
+                              rings=reach_viz.LOW_POLY_RINGS, smooth=True)
+    else:
+        mesh = uv_sphere_mesh(name, radius, smooth=True)
+    mesh.transform(Matrix.Translation(offset))
+    mesh.materials.append(get_material("Human_Reach_Mat"))
+    return mesh
+
+
+def template_mesh(height, part="body"):
+    """
+    Returns the template mesh for a height class, building it on first use.
+    part: "body", "reach" or "reach_lowpoly"
+    """
+    cls = height_class(height)
+    mesh = _TEMPLATES.get((cls, part))
+    if mesh is not None and is_alive(mesh):
+        return mesh
+    if part == "body":
+        mesh = build_body_mesh(cls, f"Human_Template_{cls:.2f}m")
+    elif part == "reach":
+        mesh = build_reach_mesh(cls, f"Human_Reach_Template_{cls:.2f}m")
+    else:
+        mesh = build_reach_mesh(cls, f"Human_Reach_Template_LowPoly_{cls:.2f}m", low_poly=True)
+    _TEMPLATES[(cls, part)] = mesh
+    return mesh
+
+
+def template_object(height, part="body"):
+    """
+    Hidden object holding a template mesh, used as the Geometry Nodes instance source.
+    """
+    mesh = template_mesh(height, part)
+    obj = bpy.data.objects.get(mesh.name)
+    if obj is None or obj.data != mesh:
+        obj = bpy.data.objects.new(mesh.name, mesh)
+        collection = bpy.data.collections.get(TEMPLATE_COLLECTION)
+        if collection is None:
+            collection = bpy.data.collections.new(TEMPLATE_COLLECTION)
+            bpy.context.scene.collection.children.link(collection)
+            collection.hide_render = True
+            collection.hide_viewport = True
+        collection.objects.link(obj)
+    return obj
+
+
+def _reach_part():
+    # Full-resolution sphere only in the original "sphere" reach mode
+    return "reach" if reach_viz.reach_mode() == "sphere" else "reach_lowpoly"
+
+
+def place_human_proxy(location, height=1.75, rotation_z=0, reach=True):
+    """
+    Places one human proxy (and its reach sphere) as linked duplicates of the
+    height-class template. Returns the body object.
+    """
+    cls = height_class(height)
+    s = height / cls
+    human = new_mesh_object(f"Human_Proxy_{height}m", template_mesh(height, "body"), location, (0, 0, rotation_z))
+    human.scale = (s, s, s)
+    if reach and reach_viz.reach_mode() == "points":
+        centers, radii = reach_envelopes(location, height, rotation_z)
+        reach_viz.add_reach_points(centers, radii, "Human_Reach_Mat")
+    elif reach:
+        sphere = new_mesh_object(f"Human_Reach_Sphere_{height}m", template_mesh(height, _reach_part()), location, (0, 0, rotation_z))
+        sphere.scale = (s, s, s)
+    return human
+
+
+def instancer_group(sources):
+    """
+    Geometry Nodes group that instances the given objects (joined) on every
+    point, using the point attributes "scale" and "rotation_z".
+    Cached by source object names; a cached group whose Object Info nodes
+    lost their objects (templates deleted by clear_scene) is re-pointed.
+    """
+    name = "Human_Instancer_" + "+".join(obj.name for obj in sources)
+    group = bpy.data.node_groups.get(name)
+    if group is not None:
+        infos = [group.nodes.get(f"Source_{i}") for i in range(len(sources))]
+        if all(infos):
+            for info, obj in zip(infos, sources):
+                if info.inputs["Object"].default_value != obj:
+                    info.inputs["Object"].default_value = obj
+            return group
+        # Built without named sources: start over
+        bpy.data.node_groups.remove(group)
+
+    group = new_geometry_group(name)
+    nodes = group.nodes
+    group_in = nodes.new('NodeGroupInput')
+    group_out = nodes.new('NodeGroupOutput')
+
+    join = nodes.new('GeometryNodeJoinGeometry')
+    for i, obj in enumerate(sources):
+        info = nodes.new('GeometryNodeObjectInfo')
+        info.name = f"Source_{i}"
+        info.inputs["Object"].default_value = obj
+        group.links.new(info.outputs["Geometry"], join.inputs["Geometry"])
+
+    scale_attr = nodes.new('GeometryNodeInputNamedAttribute')
+    scale_attr.data_type = 'FLOAT'
+    scale_attr.inputs["Name"].default_value = "scale"
+
+    rot_attr = nodes.new('GeometryNodeInputNamedAttribute')
+    rot_attr.data_type = 'FLOAT'
+    rot_attr.inputs["Name"].default_value = "rotation_z"
+    rot_xyz = nodes.new('ShaderNodeCombineXYZ')
+    group.links.new(rot_attr.outputs["Attribute"], rot_xyz.inputs["Z"])
+
+    instance = nodes.new('GeometryNodeInstanceOnPoints')
+    group.links.new(group_in.outputs[0], instance.inputs["Points"])
+    group.links.new(join.outputs["Geometry"], instance.inputs["Instance"])
+    group.links.new(rot_xyz.outputs["Vector"], instance.inputs["Rotation"])
+    group.links.new(scale_attr.outputs["Attribute"], instance.inputs["Scale"])
+    group.links.new(instance.outputs["Instances"], group_out.inputs[0])
+    return group
+
+
+def place_human_proxies(locations, heights=1.75, rotation_z=0.0, reach=True, name="Humans"):
+    """
+    Vectorized placement.
+
+    locations: (N, 3) array; heights, rotation_z: scalars or (N,) arrays.
+    Creates one point-cloud mesh object per height class with a Geometry Nodes
+    instancer, so cost grows with N only through array copies.
+    Returns the created objects.
+    """
+    locations = np.asarray(locations, dtype=np.float64).reshape(-1, 3)
+    n = len(locations)
+    heights = np.broadcast_to(np.asarray(heights, dtype=np.float64), (n,))
+    rotation_z = np.broadcast_to(np.asarray(rotation_z, dtype=np.float64), (n,))
+
+    classes = np.round(np.round(heights / HEIGHT_CLASS_STEP) * HEIGHT_CLASS_STEP, 3)
+    objects = []
+    for cls in np.unique(classes):
+        idx = np.flatnonzero(classes == cls)
+        sources = [template_object(cls, "body")]
+        if reach and reach_viz.reach_mode() != "points":
+            sources.append(template_object(cls, _reach_part()))
+
+        mesh = bpy.data.meshes.new(f"{name}_{cls:.2f}m")
+        mesh.vertices.add(len(idx))
+        mesh.vertices.foreach_set("co", locations[idx].astype(np.float32).ravel())
+        scale = mesh.attributes.new("scale", 'FLOAT', 'POINT')
+        scale.data.foreach_set("value", (heights[idx] / cls).astype(np.float32))
+        rot = mesh.attributes.new("rotation_z", 'FLOAT', 'POINT')
+        rot.data.foreach_set("value", rotation_z[idx].astype(np.float32))
+
+        obj = new_mesh_object(f"{name}_{cls:.2f}m", mesh)
+        mod = obj.modifiers.new(name="Human_Instances", type='NODES')
+        mod.node_group = instancer_group(sources)
+        objects.append(obj)
+
+    if reach and reach_viz.reach_mode() == "points":
+        centers, radii = reach_envelopes(locations, heights, rotation_z)
+        reach_viz.add_reach_points(centers, radii, "Human_Reach_Mat")
+    return objects
+
+
+def sample_walkway(start, end, count, heights=(1.55, 1.95), spacing_jitter=0.2, seed=0):
+    """
+    Samples `count` people along a straight walkway from start to end (x, y),
+    facing along the walkway (randomly either way), with uniform random heights.
+    Returns (locations, heights, rotation_z) arrays for place_human_proxies.
+    """
+    rng = np.random.default_rng(seed)
+    start = np.asarray(start, dtype=np.float64)
+    end = np.asarray(end, dtype=np.float64)
+    t = (np.arange(count) + 0.5) / count
+    t = np.clip(t + rng.uniform(-spacing_jitter, spacing_jitter, count) / max(count, 1), 0, 1)
+
+    xy = start + t[:, None] * (end - start)
+    locations = np.column_stack([xy, np.zeros(count)])
+    direction = math.atan2(end[1] - start[1], end[0] - start[0]) - math.pi / 2
+    rotation_z = direction + np.pi * rng.integers(0, 2, count)
+    return locations, rng.uniform(heights[0], heights[1], count), rotation_z
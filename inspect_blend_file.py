@@ -1,18 +1,34 @@
 import bpy
 import math
 
+def scene_summary():
+    """
+    Returns one dict per object in the scene (JSON-serializable).
+    """
+    return [
+        {
+            "name": obj.name,
+            "type": obj.type,
+            "parent": obj.parent.name if obj.parent else None,
+            "location": list(obj.location),
+            "dimensions": list(obj.dimensions),
+            "visible": not obj.hide_viewport,
+        }
+        for obj in bpy.context.scene.objects
+    ]
+
 def inspect_scene():
     print("-" * 40)
     print("SCENE INSPECTION")
     print("-" * 40)
     
-    for obj in bpy.context.scene.objects:
-        print(f"Object: {obj.name}")
-        print(f"  Type: {obj.type}")
-        print(f"  Parent: {obj.parent.name if obj.parent else 'None'}")
-        print(f"  Location: {obj.location}")
-        print(f"  Dimensions: {obj.dimensions}")
-        print(f"  Visible: {not obj.hide_viewport}")
+    for info in scene_summary():
+        print(f"Object: {info['name']}")
+        print(f"  Type: {info['type']}")
+        print(f"  Parent: {info['parent'] or 'None'}")
+        print(f"  Location: {tuple(info['location'])}")
+        print(f"  Dimensions: {tuple(info['dimensions'])}")
+        print(f"  Visible: {info['visible']}")
         print("-" * 20)
 
 if __name__ == "__main__":
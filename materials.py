@@ -0,0 +1,193 @@
+"""
+Shared material registry.
+
+All scene materials are defined once in MATERIALS and fetched with
+get_material(). Materials and images brought in by DAE imports are
+de-duplicated by content, and save_blend() purges orphan data before
+writing so the .blend only holds what the scene uses.
+"""
+import bpy
+import os
+
+# name -> settings
+# "bsdf" entries are applied to the Principled BSDF node (use_nodes=True)
+# "transparent" enables alpha blending in EEVEE; the alpha in diffuse_color
+# is what Workbench uses
+MATERIALS = {
+    "Rexroth_Alum": {"diffuse_color": (0.7, 0.7, 0.75, 1), "metallic": 0.9, "roughness": 0.3},
+    "Hole_Mat": {"diffuse_color": (0.0, 0.0, 0.0, 1), "roughness": 1.0, "specular_intensity": 0.0},
+    "Table_Mat": {"diffuse_color": (0.8, 0.8, 0.8, 1), "roughness": 0.4, "metallic": 0.8},
+    "Reach_Mat": {"diffuse_color": (0.0, 0.5, 1.0, 0.15), "transparent": True,
+                  "bsdf": {"Base Color": (0.0, 0.5, 1.0, 1.0), "Alpha": 0.15, "Roughness": 0.1}}, # Blueish
+    "Human_Mat": {"diffuse_color": (0.8, 0.6, 0.4, 1)}, # Skin-ish
+    "Human_Shirt": {"diffuse_color": (0.2, 0.2, 0.8, 1)}, # Blue shirt
+    "Human_Pants": {"diffuse_color": (0.1, 0.1, 0.1, 1)}, # Dark pants
+    "Human_Reach_Mat": {"diffuse_color": (1.0, 0.5, 0.0, 0.15), "transparent": True,
+                        "bsdf": {"Base Color": (1.0, 0.5, 0.0, 1.0), "Alpha": 0.15, "Roughness": 0.1}}, # Orange
+    "Sweep_Mat": {"diffuse_color": (1.0, 0.1, 0.1, 0.35), "transparent": True,
+                  "bsdf": {"Base Color": (1.0, 0.1, 0.1, 1.0), "Alpha": 0.35, "Roughness": 0.5}}, # Red
+    # Gantry profile utilisation (see gantry_load.py)
+    "Load_Low": {"diffuse_color": (0.1, 0.7, 0.2, 1), "roughness": 0.4}, # Green
+    "Load_Mid": {"diffuse_color": (0.9, 0.8, 0.1, 1), "roughness": 0.4}, # Yellow
+    "Load_High": {"diffuse_color": (1.0, 0.4, 0.0, 1), "roughness": 0.4}, # Orange
+    "Load_Over": {"diffuse_color": (0.9, 0.0, 0.0, 1), "roughness": 0.4}, # Red
+}
+
+# content key -> material, for imported materials
+_CANONICAL = {}
+
+
+def get_material(name):
+    """
+    Returns the named material, creating it from MATERIALS if needed.
+    """
+    mat = bpy.data.materials.get(name)
+    if mat:
+        return mat
+
+    spec = MATERIALS[name]
+    mat = bpy.data.materials.new(name=name)
+    for attr in ("diffuse_color", "metallic", "roughness", "specular_intensity"):
+        if attr in spec:
+            setattr(mat, attr, spec[attr])
+    if "bsdf" in spec:
+        mat.use_nodes = True
+        bsdf = mat.node_tree.nodes["Principled BSDF"]
+        for socket, value in spec["bsdf"].items():
+            bsdf.inputs[socket].default_value = value
+    if spec.get("transparent"):
+        # Blender 4.2+ Eevee Next uses surface_render_method;
+        # blend_method and shadow_method are deprecated/removed there
+        if hasattr(mat, "surface_render_method"):
+            mat.surface_render_method = 'BLENDED'
+        elif hasattr(mat, "blend_method"):
+            mat.blend_method = 'BLEND'
+            if hasattr(mat, "shadow_method"):
+                mat.shadow_method = 'NONE'
+    return mat
+
+
+def _round(value):
+    try:
+        return tuple(round(v, 5) for v in value)
+    except TypeError:
+        pass
+    if isinstance(value, float):
+        return round(value, 5)
+    return value
+
+
+def image_key(image):
+    """Images are the same if they point at the same file (or same generated size)."""
+    if image.filepath:
+        return ("file", os.path.normcase(os.path.abspath(bpy.path.abspath(image.filepath))))
+    return ("generated", image.name.split(".")[0], tuple(image.size))
+
+
+def material_key(mat):
+    """
+    Content key for a material: viewport settings plus, for node materials,
+    node types, unlinked input values, images and links.
+    Names are ignored, so "Material.001" and "Material" match.
+    """
+    key = [_round(tuple(mat.diffuse_color)), _round(mat.metallic), _round(mat.roughness)]
+    if mat.use_nodes and mat.node_tree:
+        nodes = []
+        for node in sorted(mat.node_tree.nodes, key=lambda n: n.name):
+            inputs = tuple(
+                _round(getattr(s, "default_value", None)) if not s.is_linked else "linked"
+                for s in node.inputs
+            )
+            image = getattr(node, "image", None)
+            nodes.append((node.bl_idname, inputs, image_key(image) if image else None))
+        links = sorted(
+            (l.from_node.bl_idname, l.from_socket.identifier, l.to_node.bl_idname, l.to_socket.identifier)
+            for l in mat.node_tree.links
+        )
+        key.append(tuple(nodes))
+        key.append(tuple(links))
+    return tuple(key)
+
+
+def dedupe_images():
+    """Remaps duplicate images (same file) onto one datablock."""
+    seen = {}
+    removed = 0
+    for image in list(bpy.data.images):
+        if image.type not in ('IMAGE', 'UV_TEST'):
+            continue
+        key = image_key(image)
+        keep = seen.get(key)
+        if keep is None:
+            seen[key] = image
+        elif keep != image:
+            image.user_remap(keep)
+            bpy.data.images.remove(image)
+            removed += 1
+    return removed
+
+
+def canonical_material(mat):
+    """
+    Returns the registered material with the same content as `mat`.
+    If one exists, `mat` is remapped onto it and removed.
+    """
+    # scene_build imports this module, so import lazily
+    from scene_build import is_alive
+
+    key = material_key(mat)
+    keep = _CANONICAL.get(key)
+    if keep is not None and not is_alive(keep):
+        keep = None
+    if keep is None or keep == mat:
+        _CANONICAL[key] = mat
+        return mat
+    mat.user_remap(keep)
+    bpy.data.materials.remove(mat)
+    return keep
+
+
+def dedupe_mesh_materials(mesh):
+    """Points a (freshly imported) mesh's slots at canonical materials."""
+    dedupe_images()
+    for i, mat in enumerate(mesh.materials):
+        if mat:
+            mesh.materials[i] = canonical_material(mat)
+
+
+def dedupe_materials():
+    """De-duplicates all images and materials in the file by content."""
+    images = dedupe_images()
+    before = len(bpy.data.materials)
+    for mat in list(bpy.data.materials):
+        canonical_material(mat)
+    return images, before - len(bpy.data.materials)
+
+
+def purge_orphans():
+    """Removes datablocks with no users (recursively)."""
+    if hasattr(bpy.data, "orphans_purge"):
+        return bpy.data.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
+
+    removed = 0
+    while True:
+        count = 0
+        for collection in (bpy.data.meshes, bpy.data.materials, bpy.data.images, bpy.data.textures):
+            for block in list(collection):
+                if block.users == 0:
+                    collection.remove(block)
+                    count += 1
+        if not count:
+            return removed
+        removed += count
+
+
+def save_blend(filepath, compress=False):
+    """
+    De-duplicates materials/images, purges orphans and saves.
+    compress=True writes a compressed .blend (smaller, slightly slower to save).
+    """
+    images, materials = dedupe_materials()
+    purged = purge_orphans()
+    print(f"Merged {materials} materials, {images} images; purged {purged} orphan datablocks")
+    bpy.ops.wm.save_as_mainfile(filepath=filepath, compress=compress)
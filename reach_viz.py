@@ -0,0 +1,146 @@
+"""
+Reach envelope visualization.
+
+Modes (set_reach_mode):
+- "sphere": one full-resolution UV sphere object per envelope (original look)
+- "instanced": linked duplicates of one shared low-poly unit sphere per material,
+  scaled to the reach radius
+- "points": all envelopes with the same material become a single point-cloud
+  object (one point per envelope, radius attribute), created when the build
+  session ends
+
+All modes use materials whose viewport colour carries the alpha, so they
+also render transparent in Workbench/EEVEE (see render_optics_table.py --fast)
+instead of needing Cycles.
+"""
+import bpy
+
+import numpy as np
+
+from materials import get_material
+from scene_build import new_mesh_object, uv_sphere_mesh, current_session, new_geometry_group, is_alive
+
+REACH_MODES = ("sphere", "instanced", "points")
+# Default keeps the original one-sphere-per-robot output; the others are opt-in
+DEFAULT_REACH_MODE = "sphere"
+
+# Resolution of the shared sphere in "instanced" mode
+LOW_POLY_SEGMENTS = 16
+LOW_POLY_RINGS = 8
+
+_mode = DEFAULT_REACH_MODE
+
+# material name -> unit sphere mesh ("instanced")
+_UNIT_SPHERES = {}
+
+# material name -> list of (N, 4) arrays of x, y, z, radius ("points")
+_pending = {}
+
+
+def set_reach_mode(mode):
+    global _mode
+    if mode not in REACH_MODES:
+        raise ValueError(f"Unknown reach mode '{mode}', expected one of {REACH_MODES}")
+    _mode = mode
+
+
+def reach_mode():
+    return _mode
+
+
+def unit_sphere(material_name):
+    mesh = _UNIT_SPHERES.get(material_name)
+    if mesh is not None and is_alive(mesh):
+        return mesh
+    mesh = uv_sphere_mesh(f"Reach_Unit_Sphere_{material_name}", 1.0,
+                          segments=LOW_POLY_SEGMENTS, rings=LOW_POLY_RINGS, smooth=True)
+    mesh.materials.append(get_material(material_name))
+    _UNIT_SPHERES[material_name] = mesh
+    return mesh
+
+
+def add_reach_envelope(location, radius, material_name="Reach_Mat", name="Reach_Sphere"):
+    """
+    Adds one reach envelope in the current mode.
+    Returns the created object ("points" mode returns None; the shared
+    point cloud is created at the end of the build session).
+    """
+    if _mode == "sphere":
+        mesh = uv_sphere_mesh(name, radius, smooth=True)
+        return new_mesh_object(name, mesh, location, material=get_material(material_name))
+
+    if _mode == "instanced":
+        obj = new_mesh_object(name, unit_sphere(material_name), location)
+        obj.scale = (radius, radius, radius)
+        return obj
+
+    add_reach_points([location], [radius], material_name)
+    return None
+
+
+def add_reach_points(centers, radii, material_name="Reach_Mat"):
+    """
+    Queues many envelopes for the shared point cloud ("points" mode).
+    centers: (N, 3), radii: scalar or (N,).
+    """
+    centers = np.asarray(centers, dtype=np.float32).reshape(-1, 3)
+    radii = np.broadcast_to(np.asarray(radii, dtype=np.float32), (len(centers),))
+    _pending.setdefault(material_name, []).append(np.column_stack([centers, radii]))
+    session = current_session()
+    if session is not None:
+        session.defer(flush_reach_points)
+    else:
+        flush_reach_points()
+
+
+def points_group(material):
+    """
+    Geometry Nodes group: mesh vertices -> point cloud using the "radius"
+    attribute, with the reach material.
+    """
+    name = f"Reach_Points_{material.name}"
+    group = bpy.data.node_groups.get(name)
+    if group is not None:
+        return group
+
+    group = new_geometry_group(name)
+    nodes = group.nodes
+    group_in = nodes.new('NodeGroupInput')
+    group_out = nodes.new('NodeGroupOutput')
+
+    radius = nodes.new('GeometryNodeInputNamedAttribute')
+    radius.data_type = 'FLOAT'
+    radius.inputs["Name"].default_value = "radius"
+
+    to_points = nodes.new('GeometryNodeMeshToPoints')
+    set_mat = nodes.new('GeometryNodeSetMaterial')
+    set_mat.inputs["Material"].default_value = material
+
+    group.links.new(group_in.outputs[0], to_points.inputs["Mesh"])
+    group.links.new(radius.outputs["Attribute"], to_points.inputs["Radius"])
+    group.links.new(to_points.outputs["Points"], set_mat.inputs["Geometry"])
+    group.links.new(set_mat.outputs["Geometry"], group_out.inputs[0])
+    return group
+
+
+def flush_reach_points():
+    """
+    Creates one point-cloud object per material from the pending envelopes.
+    """
+    objects = []
+    for material_name, envelopes in _pending.items():
+        if not envelopes:
+            continue
+        data = np.concatenate(envelopes).astype(np.float32)
+        mesh = bpy.data.meshes.new(f"Reach_Points_{material_name}")
+        mesh.vertices.add(len(data))
+        mesh.vertices.foreach_set("co", data[:, :3].ravel())
+        attr = mesh.attributes.new("radius", 'FLOAT', 'POINT')
+        attr.data.foreach_set("value", data[:, 3])
+
+        obj = new_mesh_object(f"Reach_Points_{material_name}", mesh)
+        mod = obj.modifiers.new(name="Reach_Points", type='NODES')
+        mod.node_group = points_group(get_material(material_name))
+        objects.append(obj)
+    _pending.clear()
+    return objects
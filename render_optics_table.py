@@ -1,64 +1,240 @@
 import bpy
 import math
 import os
+import re
+import sys
+import json
+import time
+import argparse
 
-def render_table():
-    # Open the existing file
-    blend_file_path = os.path.abspath("optics_table.blend")
-    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from script_args import script_argv
 
+def get_or_add(name, add, **kwargs):
+    """
+    Returns the object called `name`, adding it with the `add` operator if missing,
+    so setting up the same scene twice doesn't stack cameras and lights.
+    """
+    obj = bpy.data.objects.get(name)
+    if obj is None:
+        add(**kwargs)
+        obj = bpy.context.active_object
+        obj.name = name
+    return obj
+
+def point_at(obj, target):
+    """Rotates obj so its -Z axis looks at target (cameras and lights)."""
+    import mathutils
+    direction = mathutils.Vector(target) - obj.location
+    obj.rotation_mode = 'XYZ'
+    obj.rotation_euler = direction.to_track_quat('-Z', 'Y').to_euler()
+
+def setup_render(fast=False):
+    """
+    Adds (or reuses) the camera and lights and sets the render engine.
+    fast=True uses Workbench (rasterized, material colours incl. alpha) instead
+    of Cycles - good enough for reach/coverage checks and takes seconds.
+    """
     # Add Camera
     # Table center is roughly 0,0,0.8+0.15 = ~0.95m high
     # Position camera to view from isometric-ish angle
     # Moved back further for duplicated scene (two workcells + walkway)
     # Total width ~10m.
     camera_loc = (8, -10, 6)
-    bpy.ops.object.camera_add(location=camera_loc)
-    camera = bpy.context.active_object
-    camera.rotation_mode = 'XYZ'
+    camera = get_or_add("Render_Camera", bpy.ops.object.camera_add, location=camera_loc)
     # Point camera at center (roughly)
-    # Manual rotation for (8, -10, 6) looking at (0,0,1)
-    import mathutils
-    look_at = mathutils.Vector((0, 0, 1))
-    direction = look_at - camera.location
-    rot_quat = direction.to_track_quat('-Z', 'Y')
-    camera.rotation_euler = rot_quat.to_euler()
+    point_at(camera, (0, 0, 1))
     
     bpy.context.scene.camera = camera
 
     # Add Light (Sun)
-    bpy.ops.object.light_add(type='SUN', location=(5, 5, 10))
-    sun = bpy.context.active_object
+    sun = get_or_add("Render_Sun", bpy.ops.object.light_add, type='SUN', location=(5, 5, 10))
     sun.data.energy = 3.0
     # Point sun roughly at table
-    direction_sun = mathutils.Vector((0, 0, 0)) - sun.location
-    rot_quat_sun = direction_sun.to_track_quat('-Z', 'Y')
-    sun.rotation_euler = rot_quat_sun.to_euler()
+    point_at(sun, (0, 0, 0))
 
     # Add Fill Light (Area)
-    bpy.ops.object.light_add(type='AREA', location=(-3, -3, 5))
-    fill = bpy.context.active_object
+    fill = get_or_add("Render_Fill", bpy.ops.object.light_add, type='AREA', location=(-3, -3, 5))
     fill.data.energy = 500.0
     fill.data.size = 5.0
-    direction_fill = mathutils.Vector((0, 0, 0)) - fill.location
-    rot_quat_fill = direction_fill.to_track_quat('-Z', 'Y')
-    fill.rotation_euler = rot_quat_fill.to_euler()
+    point_at(fill, (0, 0, 0))
 
     # Render Settings
-    bpy.context.scene.render.engine = 'CYCLES' # Cycles handles transparency/transmission much better
-    # bpy.context.scene.render.engine = 'BLENDER_EEVEE_NEXT' 
-    
-    # Cycles settings for speed
-    bpy.context.scene.cycles.samples = 128
-    bpy.context.scene.cycles.use_denoising = True 
+    if fast:
+        # Reach envelopes use the alpha in their viewport colour (see materials.py)
+        bpy.context.scene.render.engine = 'BLENDER_WORKBENCH'
+        shading = bpy.context.scene.display.shading
+        shading.light = 'STUDIO'
+        shading.color_type = 'MATERIAL'
+        shading.show_shadows = True
+        bpy.context.scene.display.render_aa = '8'
+    else:
+        bpy.context.scene.render.engine = 'CYCLES' # Cycles handles transparency/transmission much better
+        # bpy.context.scene.render.engine = 'BLENDER_EEVEE_NEXT' 
+        
+        # Cycles settings for speed
+        bpy.context.scene.cycles.samples = 128
+        bpy.context.scene.cycles.use_denoising = True 
+    return camera
+
+def render_table(fast=False, blend_file_path="optics_table.blend", output="optics_table_render.png", resolution=(1024, 768)):
+    """
+    Renders optics_table.blend to optics_table_render.png.
+    blend_file_path=None renders the scene that is already loaded
+    (used by the persistent worker, see blender_worker.py).
+    """
+    if blend_file_path:
+        # Open the existing file
+        bpy.ops.wm.open_mainfile(filepath=os.path.abspath(blend_file_path))
+
+    setup_render(fast)
     
-    bpy.context.scene.render.resolution_x = 1024
-    bpy.context.scene.render.resolution_y = 768
-    bpy.context.scene.render.filepath = os.path.abspath("optics_table_render.png")
+    bpy.context.scene.render.resolution_x = resolution[0]
+    bpy.context.scene.render.resolution_y = resolution[1]
+    bpy.context.scene.render.filepath = os.path.abspath(output)
 
     # Render
     bpy.ops.render.render(write_still=True)
     print(f"Rendered to {bpy.context.scene.render.filepath}")
+    return bpy.context.scene.render.filepath
+
+# Named viewpoints for render_views: camera location, look-at target
+VIEWS = {
+    "iso": ((8, -10, 6), (0, 0, 1)),
+    "top": ((0, 0.01, 14), (0, 0, 0)),
+    "front": ((0, -12, 2.5), (0, 0, 1.2)),
+    "side": ((12, 0, 3), (0, 0, 1.2)),
+    "walkway": ((0, -6, 1.7), (0, 0, 1.5)),
+}
+
+def setup_cycles_session(threads=None, samples=128):
+    """
+    Cycles settings for rendering several views in one process:
+    persistent data keeps the synced scene, BVH and textures between renders;
+    threads fixes the CPU thread count (None = all cores).
+    """
+    scene = bpy.context.scene
+    render = scene.render
+    render.use_persistent_data = True
+    if threads:
+        render.threads_mode = 'FIXED'
+        render.threads = threads
+    else:
+        render.threads_mode = 'AUTO'
+
+    cycles = scene.cycles
+    cycles.samples = samples
+    if threads:
+        # Explicit threads only make sense for CPU rendering
+        cycles.device = 'CPU'
+    if hasattr(cycles, "use_light_tree"):
+        # Blender 3.5+: many-light sampling, built once with the scene
+        cycles.use_light_tree = True
+    if hasattr(cycles, "debug_use_spatial_splits"):
+        # Spatial splits make a slower-to-build BVH; worth it only for a single frame
+        cycles.debug_use_spatial_splits = False
+
+def _view_camera(name):
+    location, target = VIEWS[name]
+    camera = get_or_add(f"View_{name}", bpy.ops.object.camera_add, location=location)
+    camera.location = location
+    point_at(camera, target)
+    return camera
+
+def render_views(views=("iso",), frames=None, fast=False, blend_file_path="optics_table.blend",
+                 output_dir="renders", resolution=(1024, 768), threads=None, samples=128,
+                 stats_path="render_stats.json"):
+    """
+    Renders every view (a name from VIEWS or an existing camera object) for
+    every frame in one session, opening the file and syncing the scene once.
+    Returns one stats dict per image and writes them to stats_path.
+    """
+    if blend_file_path:
+        bpy.ops.wm.open_mainfile(filepath=os.path.abspath(blend_file_path))
+
+    scene = bpy.context.scene
+    setup_render(fast)
+    if not fast:
+        setup_cycles_session(threads, samples)
+    scene.render.resolution_x = resolution[0]
+    scene.render.resolution_y = resolution[1]
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Last stats line Blender reports during each render (includes peak memory)
+    last_stats = []
+    def on_stats(stats, *_args):
+        last_stats[:] = [stats]
+
+    # Add every camera up front: adding objects between renders would
+    # invalidate the persistent scene sync
+    cameras = {}
+    for view in views:
+        cameras[view] = _view_camera(view) if view in VIEWS else bpy.data.objects.get(view)
+        if cameras[view] is None:
+            raise KeyError(f"No view or camera named '{view}'")
+
+    handler = bpy.app.handlers.render_stats
+    handler.append(on_stats)
+    results = []
+    try:
+        for frame in (frames or [scene.frame_current]):
+            scene.frame_set(frame)
+            for view in views:
+                scene.camera = cameras[view]
+                scene.render.filepath = os.path.abspath(os.path.join(output_dir, f"{view}_{frame:04d}.png"))
+
+                last_stats.clear()
+                t0 = time.perf_counter()
+                bpy.ops.render.render(write_still=True)
+                elapsed = time.perf_counter() - t0
+
+                stats = last_stats[0] if last_stats else ""
+                peak = re.search(r"Peak:?\s*([\d.]+)\s*([MG])", stats)
+                results.append({
+                    "view": view,
+                    "frame": frame,
+                    "output": scene.render.filepath,
+                    "seconds": round(elapsed, 3),
+                    "peak_memory_mb": (float(peak.group(1)) * (1024 if peak.group(2) == "G" else 1)) if peak else None,
+                    "stats": stats,
+                })
+                print(f"{view} frame {frame}: {elapsed:.2f}s -> {scene.render.filepath}")
+    finally:
+        handler.remove(on_stats)
+
+    if results:
+        first, rest = results[0]["seconds"], [r["seconds"] for r in results[1:]]
+        if rest:
+            print(f"First image {first:.2f}s (includes scene sync), then {sum(rest) / len(rest):.2f}s on average")
+    if stats_path:
+        with open(stats_path, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+def parse_frames(text):
+    """"1,5,10-20" -> [1, 5, 10, 11, ..., 20]"""
+    frames = []
+    for part in text.split(","):
+        start, _, end = part.partition("-")
+        frames += range(int(start), int(end or start) + 1)
+    return frames
+
+def parse_args(argv):
+    argv = script_argv(argv)
+    parser = argparse.ArgumentParser(description="Render the optics table")
+    parser.add_argument("--fast", action="store_true", help="Workbench instead of Cycles")
+    parser.add_argument("--views", type=lambda text: text.split(","),
+                        help="Comma-separated views (see VIEWS) or camera objects, rendered in one session")
+    parser.add_argument("--threads", type=int, help="Fixed CPU thread count")
+    parser.add_argument("--frames", type=parse_frames, help="e.g. 1,5,10-20 (default: the current frame)")
+    parser.add_argument("--samples", type=int, default=128, help="Cycles samples per image")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    render_table()
+    # blender -b -P render_optics_table.py -- --fast
+    # blender -b -P render_optics_table.py -- --views iso,top,front --threads 8 --frames 1-24 --samples 64
+    args = parse_args(sys.argv)
+    if args.views:
+        render_views(args.views, frames=args.frames, fast=args.fast, threads=args.threads, samples=args.samples)
+    else:
+        render_table(fast=args.fast)
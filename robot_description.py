@@ -0,0 +1,665 @@
+"""
+URDF / xacro loader for the robot descriptions in franka_description.
+
+Expands the xacro files, extracts the joint tree, joint limits and visual
+origins, and compiles them into a compact chain that is cached on disk as JSON
+(keyed by the hash of the source files), so building arms and running
+kinematics only pays the xacro expansion once.
+
+Does not depend on bpy, so it can also be used from plain Python.
+"""
+import os
+import re
+import ast
+import json
+import math
+import hashlib
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+DESCRIPTION_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "franka_description")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".kinematics_cache")
+
+# Bump when the compiled format changes so stale cache entries are ignored
+CACHE_VERSION = 1
+
+# franka_description defaults to an arm without hand; we always want the hand
+DEFAULT_MAPPINGS = {"hand": "true"}
+
+XACRO_NS = "http://www.ros.org/wiki/xacro"
+
+# Used when franka_description is not checked out.
+# Same values as the hand-copied table that create_franka_arm used to carry
+# (kinematics.yaml + franka_hand.xacro).
+FALLBACK_URDF = """<?xml version="1.0"?>
+<robot name="fr3">
+  <link name="fr3_link0"><visual><geometry><mesh filename="package://franka_description/meshes/robot_arms/fr3/visual/link0.dae"/></geometry></visual></link>
+  <link name="fr3_link1"><visual><geometry><mesh filename="package://franka_description/meshes/robot_arms/fr3/visual/link1.dae"/></geometry></visual></link>
+  <link name="fr3_link2"><visual><geometry><mesh filename="package://franka_description/meshes/robot_arms/fr3/visual/link2.dae"/></geometry></visual></link>
+  <link name="fr3_link3"><visual><geometry><mesh filename="package://franka_description/meshes/robot_arms/fr3/visual/link3.dae"/></geometry></visual></link>
+  <link name="fr3_link4"><visual><geometry><mesh filename="package://franka_description/meshes/robot_arms/fr3/visual/link4.dae"/></geometry></visual></link>
+  <link name="fr3_link5"><visual><geometry><mesh filename="package://franka_description/meshes/robot_arms/fr3/visual/link5.dae"/></geometry></visual></link>
+  <link name="fr3_link6"><visual><geometry><mesh filename="package://franka_description/meshes/robot_arms/fr3/visual/link6.dae"/></geometry></visual></link>
+  <link name="fr3_link7"><visual><geometry><mesh filename="package://franka_description/meshes/robot_arms/fr3/visual/link7.dae"/></geometry></visual></link>
+  <link name="fr3_link8"/>
+  <link name="fr3_hand"><visual><geometry><mesh filename="package://franka_description/meshes/robot_ee/franka_hand_white/visual/hand.dae"/></geometry></visual></link>
+  <link name="fr3_leftfinger"><visual><geometry><mesh filename="package://franka_description/meshes/robot_ee/franka_hand_white/visual/finger.dae"/></geometry></visual></link>
+  <link name="fr3_rightfinger"><visual><geometry><mesh filename="package://franka_description/meshes/robot_ee/franka_hand_white/visual/finger.dae"/></geometry></visual></link>
+  <joint name="fr3_joint1" type="revolute"><parent link="fr3_link0"/><child link="fr3_link1"/><origin xyz="0 0 0.333" rpy="0 0 0"/><axis xyz="0 0 1"/><limit lower="-2.7437" upper="2.7437" effort="87" velocity="2.62"/></joint>
+  <joint name="fr3_joint2" type="revolute"><parent link="fr3_link1"/><child link="fr3_link2"/><origin xyz="0 0 0" rpy="-1.57079632679 0 0"/><axis xyz="0 0 1"/><limit lower="-1.7837" upper="1.7837" effort="87" velocity="2.62"/></joint>
+  <joint name="fr3_joint3" type="revolute"><parent link="fr3_link2"/><child link="fr3_link3"/><origin xyz="0 -0.316 0" rpy="1.57079632679 0 0"/><axis xyz="0 0 1"/><limit lower="-2.9007" upper="2.9007" effort="87" velocity="2.62"/></joint>
+  <joint name="fr3_joint4" type="revolute"><parent link="fr3_link3"/><child link="fr3_link4"/><origin xyz="0.0825 0 0" rpy="1.57079632679 0 0"/><axis xyz="0 0 1"/><limit lower="-3.0421" upper="-0.1518" effort="87" velocity="2.62"/></joint>
+  <joint name="fr3_joint5" type="revolute"><parent link="fr3_link4"/><child link="fr3_link5"/><origin xyz="-0.0825 0.384 0" rpy="-1.57079632679 0 0"/><axis xyz="0 0 1"/><limit lower="-2.8065" upper="2.8065" effort="12" velocity="5.26"/></joint>
+  <joint name="fr3_joint6" type="revolute"><parent link="fr3_link5"/><child link="fr3_link6"/><origin xyz="0 0 0" rpy="1.57079632679 0 0"/><axis xyz="0 0 1"/><limit lower="0.5445" upper="4.5169" effort="12" velocity="4.18"/></joint>
+  <joint name="fr3_joint7" type="revolute"><parent link="fr3_link6"/><child link="fr3_link7"/><origin xyz="0.088 0 0" rpy="1.57079632679 0 0"/><axis xyz="0 0 1"/><limit lower="-3.0159" upper="3.0159" effort="12" velocity="5.26"/></joint>
+  <joint name="fr3_joint8" type="fixed"><parent link="fr3_link7"/><child link="fr3_link8"/><origin xyz="0 0 0.107" rpy="0 0 0"/></joint>
+  <joint name="fr3_hand_joint" type="fixed"><parent link="fr3_link8"/><child link="fr3_hand"/><origin xyz="0 0 0" rpy="0 0 0.785398163397"/></joint>
+  <joint name="fr3_finger_joint1" type="prismatic"><parent link="fr3_hand"/><child link="fr3_leftfinger"/><origin xyz="0 0 0.0584" rpy="0 0 0"/><axis xyz="0 1 0"/><limit lower="0" upper="0.04" effort="100" velocity="0.2"/></joint>
+  <joint name="fr3_finger_joint2" type="prismatic"><parent link="fr3_hand"/><child link="fr3_rightfinger"/><origin xyz="0 0 0.0584" rpy="0 0 3.14159265359"/><axis xyz="0 1 0"/><limit lower="0" upper="0.04" effort="100" velocity="0.2"/><mimic joint="fr3_finger_joint1"/></joint>
+</robot>
+"""
+
+# In-process cache so several arms in one scene share one load
+_LOADED = {}
+
+
+# --- xacro expansion ---
+
+class _AttrDict(dict):
+    """Dict with attribute access, like xacro's YAML wrapper."""
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+
+def _wrap(value):
+    if isinstance(value, dict):
+        return _AttrDict((k, _wrap(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_wrap(v) for v in value]
+    return value
+
+
+def _parse_scalar(text):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+        return text[1:-1]
+    if text in ("true", "True"):
+        return True
+    if text in ("false", "False"):
+        return False
+    if text in ("null", "~", ""):
+        return None
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def _load_simple_yaml(text):
+    """
+    Minimal YAML reader for the nested key/value files in franka_description
+    (kinematics.yaml, joint_limits.yaml, ...). Used when PyYAML is missing.
+    """
+    root = {}
+    stack = [(-1, root)]
+    for raw in text.splitlines():
+        line = raw.split(" #")[0].rstrip()
+        if not line.strip() or line.lstrip().startswith(("#", "---")):
+            continue
+        indent = len(line) - len(line.lstrip())
+        key, _, value = line.strip().partition(":")
+        while stack[-1][0] >= indent:
+            stack.pop()
+        parent = stack[-1][1]
+        if value.strip():
+            parent[_parse_scalar(key)] = _parse_scalar(value)
+        else:
+            child = {}
+            parent[_parse_scalar(key)] = child
+            stack.append((indent, child))
+    return root
+
+
+def load_yaml(path):
+    with open(path) as f:
+        text = f.read()
+    try:
+        import yaml
+        data = yaml.safe_load(text)
+    except ImportError:
+        data = _load_simple_yaml(text)
+    return _wrap(data)
+
+
+class _XacroModule:
+    """Exposes `xacro.load_yaml(...)` inside ${} expressions."""
+    def __init__(self, expander):
+        self._expander = expander
+
+    def load_yaml(self, path):
+        return self._expander.load_yaml(path)
+
+
+def _to_number(value):
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _truthy(value):
+    if isinstance(value, str):
+        value = value.strip()
+        if value in ("true", "True", "1"):
+            return True
+        if value in ("false", "False", "0", ""):
+            return False
+        return bool(_to_number(value))
+    return bool(value)
+
+
+class XacroExpander:
+    """
+    Subset of xacro used by robot descriptions: include, property, arg,
+    macro (with default, block and ^ parameters), insert_block, if/unless,
+    $(arg), $(find) and ${} expressions.
+    """
+
+    def __init__(self, package_root, mappings=None):
+        self.package_root = package_root
+        self.args = dict(mappings or {})
+        self.macros = {}
+        self.sources = []
+        self.eval_globals = {name: getattr(math, name) for name in dir(math) if not name.startswith("_")}
+        self.eval_globals.update({
+            "true": True, "false": False, "True": True, "False": False,
+            "load_yaml": self.load_yaml, "xacro": _XacroModule(self),
+            "abs": abs, "min": min, "max": max, "float": float, "int": int, "str": str, "len": len,
+            "__builtins__": {},
+        })
+
+    def find_package(self, name):
+        if name == os.path.basename(os.path.normpath(self.package_root)) or name == "franka_description":
+            return self.package_root
+        sibling = os.path.join(os.path.dirname(os.path.normpath(self.package_root)), name)
+        if os.path.isdir(sibling):
+            return sibling
+        raise ValueError(f"Cannot resolve package '{name}'")
+
+    def load_yaml(self, path):
+        self.sources.append(os.path.abspath(path))
+        return load_yaml(path)
+
+    def _substitute_args(self, text):
+        def repl(m):
+            cmd, _, arg = m.group(1).strip().partition(" ")
+            arg = arg.strip()
+            if cmd == "arg":
+                if arg not in self.args:
+                    raise ValueError(f"Undefined xacro arg '{arg}'")
+                return str(self.args[arg])
+            if cmd == "find":
+                return self.find_package(arg)
+            raise ValueError(f"Unsupported substitution $({cmd} ...)")
+        return re.sub(r"\$\(([^)]*)\)", repl, text)
+
+    def evaluate(self, text, scope):
+        """Substitutes $() and ${} in an attribute/text value."""
+        if text is None or "$" not in text:
+            return text
+        text = self._substitute_args(text)
+        parts = re.split(r"\$\{([^}]*)\}", text)
+        if len(parts) == 3 and parts[0] == "" and parts[2] == "":
+            # Whole value is one expression: keep its type (numbers, dicts)
+            return self._eval(parts[1], scope)
+        out = []
+        for i, part in enumerate(parts):
+            if i % 2:
+                value = self._eval(part, scope)
+                if isinstance(value, float) and value.is_integer():
+                    value = int(value)
+                out.append(str(value))
+            else:
+                out.append(part)
+        return "".join(out)
+
+    def _eval(self, expr, scope):
+        local = {k: _to_number(v) for k, v in scope.items()}
+        return eval(expr, self.eval_globals, local)
+
+    def _evaluate_str(self, text, scope):
+        value = self.evaluate(text, scope)
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return value if isinstance(value, str) else str(value)
+
+    def expand_file(self, path):
+        path = os.path.abspath(path)
+        self.sources.append(path)
+        root = ET.parse(path).getroot()
+        scope = {}
+        out = ET.Element(root.tag, {k: self._evaluate_str(v, scope) for k, v in root.attrib.items()})
+        self._expand_children(root, out, scope, {}, os.path.dirname(path))
+        return out
+
+    def _expand_children(self, elem, out, scope, blocks, base_dir):
+        for child in list(elem):
+            self._expand(child, out, scope, blocks, base_dir)
+
+    def _expand(self, elem, out, scope, blocks, base_dir):
+        tag = elem.tag
+        if not isinstance(tag, str):
+            return  # comments / processing instructions
+        if not tag.startswith("{%s}" % XACRO_NS):
+            new = ET.SubElement(out, tag, {k: self._evaluate_str(v, scope) for k, v in elem.attrib.items()
+                                           if not k.startswith("{%s}" % XACRO_NS)})
+            if elem.text and elem.text.strip():
+                new.text = self._evaluate_str(elem.text, scope)
+            self._expand_children(elem, new, scope, blocks, base_dir)
+            return
+
+        name = tag[len(XACRO_NS) + 2:]
+        if name == "arg":
+            arg = elem.get("name")
+            if arg not in self.args:
+                self.args[arg] = self._evaluate_str(elem.get("default", ""), scope)
+        elif name == "property":
+            value = elem.get("value")
+            if value is not None:
+                scope[elem.get("name")] = self.evaluate(value, scope)
+            elif elem.get("default") is not None:
+                scope.setdefault(elem.get("name"), self.evaluate(elem.get("default"), scope))
+            else:
+                # Block property
+                block = ET.Element("block")
+                self._expand_children(elem, block, scope, blocks, base_dir)
+                blocks[elem.get("name")] = list(block)
+        elif name == "include":
+            filename = self._evaluate_str(elem.get("filename"), scope)
+            if not os.path.isabs(filename):
+                filename = os.path.join(base_dir, filename)
+            filename = os.path.abspath(filename)
+            self.sources.append(filename)
+            included = ET.parse(filename).getroot()
+            self._expand_children(included, out, scope, blocks, os.path.dirname(filename))
+        elif name == "macro":
+            self.macros[elem.get("name")] = (elem, base_dir)
+        elif name in ("if", "unless"):
+            cond = _truthy(self.evaluate(elem.get("value"), scope))
+            if cond == (name == "if"):
+                self._expand_children(elem, out, scope, blocks, base_dir)
+        elif name == "insert_block":
+            block_name = self._evaluate_str(elem.get("name"), scope)
+            for node in blocks.get(block_name, []):
+                out.append(node)
+        elif name in self.macros:
+            self._call_macro(elem, name, out, scope, blocks, base_dir)
+        else:
+            raise ValueError(f"Unsupported xacro element '{name}'")
+
+    def _call_macro(self, elem, name, out, scope, blocks, base_dir):
+        macro, macro_dir = self.macros[name]
+        local = dict(scope)
+        local_blocks = dict(blocks)
+        block_children = [c for c in elem if isinstance(c.tag, str)]
+
+        for param in macro.get("params", "").split():
+            pname, _, default = param.partition(":=")
+            if pname.startswith("**"):
+                holder = ET.Element("block")
+                self._expand_children(block_children.pop(0), holder, scope, blocks, base_dir)
+                local_blocks[pname[2:]] = list(holder)
+            elif pname.startswith("*"):
+                holder = ET.Element("block")
+                self._expand(block_children.pop(0), holder, scope, blocks, base_dir)
+                local_blocks[pname[1:]] = list(holder)
+            elif pname in elem.attrib:
+                local[pname] = self.evaluate(elem.get(pname), scope)
+            elif default.startswith("^"):
+                # Forward from the caller's scope, else the default after ^|
+                fallback = default[2:] if default.startswith("^|") else None
+                if pname in scope:
+                    local[pname] = scope[pname]
+                elif fallback is not None:
+                    local[pname] = self.evaluate(fallback, scope)
+                else:
+                    raise ValueError(f"Macro '{name}' needs '{pname}' from the caller's scope")
+            elif default:
+                local[pname] = self.evaluate(default, local)
+            else:
+                raise ValueError(f"Macro '{name}' is missing parameter '{pname}'")
+
+        self._expand_children(macro, out, local, local_blocks, macro_dir)
+
+
+def expand_xacro(path, package_root=DESCRIPTION_ROOT, mappings=None):
+    """
+    Returns (urdf_root_element, source_files) for a .xacro or .urdf file.
+    Uses the ROS xacro module when it is installed, else the built-in subset.
+    """
+    mappings = dict(DEFAULT_MAPPINGS, **(mappings or {}))
+    try:
+        import xacro
+    except ImportError:
+        xacro = None
+
+    if xacro is not None:
+        # Record every file xacro reads (includes and xacro.load_yaml) so
+        # edits to any of them invalidate the compiled-chain cache
+        sources = [os.path.abspath(path)]
+        ros_load_yaml = xacro.load_yaml
+
+        def recording_load_yaml(filename):
+            resolve = getattr(xacro, "abs_filename_spec", os.path.abspath)
+            sources.append(os.path.abspath(resolve(filename)))
+            return ros_load_yaml(filename)
+
+        del xacro.all_includes[:]
+        xacro.load_yaml = recording_load_yaml
+        try:
+            doc = xacro.process_file(path, mappings=mappings)
+        finally:
+            xacro.load_yaml = ros_load_yaml
+        sources += [os.path.abspath(include) for include in xacro.all_includes]
+        return ET.fromstring(doc.toxml()), sources
+
+    expander = XacroExpander(package_root, mappings)
+    root = expander.expand_file(path)
+    return root, expander.sources
+
+
+# --- URDF parsing / compilation ---
+
+def _floats(text, default):
+    if text is None:
+        return list(default)
+    return [float(v) for v in text.split()]
+
+
+def _origin(elem):
+    origin = elem.find("origin") if elem is not None else None
+    if origin is None:
+        return [0.0, 0.0, 0.0], [0.0, 0.0, 0.0]
+    return _floats(origin.get("xyz"), (0, 0, 0)), _floats(origin.get("rpy"), (0, 0, 0))
+
+
+def resolve_mesh_path(filename, package_root=DESCRIPTION_ROOT):
+    """Turns package://pkg/... and file:// URIs into local paths."""
+    if filename.startswith("package://"):
+        pkg, _, rest = filename[len("package://"):].partition("/")
+        return os.path.join(XacroExpander(package_root).find_package(pkg), rest)
+    if filename.startswith("file://"):
+        return filename[len("file://"):]
+    return filename
+
+
+def compile_urdf(root, package_root=DESCRIPTION_ROOT):
+    """
+    Compiles a parsed URDF into a compact, JSON-serializable chain.
+    Joints are stored in topological order (parents before children),
+    links are referenced by index.
+    """
+    joints_by_parent = {}
+    children = set()
+    for j in root.findall("joint"):
+        parent = j.find("parent").get("link")
+        child = j.find("child").get("link")
+        children.add(child)
+        joints_by_parent.setdefault(parent, []).append(j)
+
+    link_elems = {l.get("name"): l for l in root.findall("link")}
+    roots = [name for name in link_elems if name not in children]
+    if len(roots) != 1:
+        raise ValueError(f"Expected one root link, found {roots}")
+
+    links = [roots[0]]
+    joints = []
+    stack = [roots[0]]
+    while stack:
+        parent = stack.pop(0)
+        for j in joints_by_parent.get(parent, []):
+            child = j.find("child").get("link")
+            xyz, rpy = _origin(j)
+            axis = j.find("axis")
+            limit = j.find("limit")
+            mimic = j.find("mimic")
+            links.append(child)
+            joints.append({
+                "name": j.get("name"),
+                "type": j.get("type"),
+                "parent": links.index(parent),
+                "child": len(links) - 1,
+                "xyz": xyz,
+                "rpy": rpy,
+                "axis": _floats(axis.get("xyz") if axis is not None else None, (1, 0, 0)),
+                "lower": float(limit.get("lower", 0)) if limit is not None else 0.0,
+                "upper": float(limit.get("upper", 0)) if limit is not None else 0.0,
+                "velocity": float(limit.get("velocity", 0)) if limit is not None else 0.0,
+                "effort": float(limit.get("effort", 0)) if limit is not None else 0.0,
+                "mimic": None if mimic is None else {
+                    "joint": mimic.get("joint"),
+                    "multiplier": float(mimic.get("multiplier", 1)),
+                    "offset": float(mimic.get("offset", 0)),
+                },
+            })
+            stack.append(child)
+
+    visuals = {}
+    for name in links:
+        for v in link_elems[name].findall("visual"):
+            mesh = v.find("geometry/mesh")
+            if mesh is None:
+                continue
+            xyz, rpy = _origin(v)
+            visuals.setdefault(name, []).append({
+                "mesh": os.path.abspath(resolve_mesh_path(mesh.get("filename"), package_root)),
+                "xyz": xyz,
+                "rpy": rpy,
+                "scale": _floats(mesh.get("scale"), (1, 1, 1)),
+            })
+
+    return {
+        "version": CACHE_VERSION,
+        "robot": root.get("name"),
+        "links": links,
+        "joints": joints,
+        "visuals": visuals,
+    }
+
+
+def find_robot_file(robot="fr3", package_root=DESCRIPTION_ROOT):
+    candidates = [
+        os.path.join(package_root, "robots", robot, f"{robot}.urdf.xacro"),
+        os.path.join(package_root, "robots", f"{robot}.urdf.xacro"),
+        os.path.join(package_root, "urdf", f"{robot}.urdf.xacro"),
+        os.path.join(package_root, "urdf", f"{robot}.urdf"),
+    ]
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+
+def _cache_path(path, mappings, cache_dir):
+    key = hashlib.sha256()
+    key.update(str(CACHE_VERSION).encode())
+    key.update(_file_hash(path).encode())
+    key.update(json.dumps(sorted(mappings.items())).encode())
+    name = os.path.splitext(os.path.basename(path))[0].replace(".urdf", "")
+    return os.path.join(cache_dir, f"{name}-{key.hexdigest()[:16]}.json")
+
+
+def _cache_valid(chain):
+    for source, digest in chain.get("sources", {}).items():
+        if not os.path.exists(source) or _file_hash(source) != digest:
+            return False
+    return chain.get("version") == CACHE_VERSION
+
+
+def load_robot(path=None, robot="fr3", package_root=DESCRIPTION_ROOT, mappings=None, cache_dir=CACHE_DIR):
+    """
+    Returns the compiled chain for a robot description.
+
+    path: .urdf/.xacro file; defaults to robots/<robot>/<robot>.urdf.xacro.
+    Falls back to the built-in FR3 table when franka_description is missing.
+    Results are cached in memory and on disk, keyed by the hash of the
+    top-level file; both are re-validated against the hashes of every
+    included file on each call.
+    """
+    mappings = dict(DEFAULT_MAPPINGS, **(mappings or {}))
+    if path is None:
+        path = find_robot_file(robot, package_root)
+
+    if path is None:
+        if robot != "fr3":
+            raise FileNotFoundError(f"No description for '{robot}' under {package_root}")
+        key = ("<fallback>", robot)
+        if key not in _LOADED:
+            _LOADED[key] = compile_urdf(ET.fromstring(FALLBACK_URDF), package_root)
+        return _LOADED[key]
+
+    path = os.path.abspath(path)
+    cache_file = _cache_path(path, mappings, cache_dir)
+    # In-process hits are re-validated too: a long-lived worker keeps
+    # _LOADED while included xacro/YAML files are edited
+    chain = _LOADED.get(cache_file)
+    if chain is not None and _cache_valid(chain):
+        return chain
+
+    chain = None
+    if os.path.exists(cache_file):
+        with open(cache_file) as f:
+            chain = json.load(f)
+        if not _cache_valid(chain):
+            chain = None
+
+    if chain is None:
+        if path.endswith(".xacro"):
+            root, sources = expand_xacro(path, package_root, mappings)
+        else:
+            root, sources = ET.parse(path).getroot(), [path]
+        chain = compile_urdf(root, package_root)
+        chain["sources"] = {s: _file_hash(s) for s in sorted(set(sources))}
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = cache_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(chain, f)
+        os.replace(tmp, cache_file)
+
+    _LOADED[cache_file] = chain
+    return chain
+
+
+def short_link_name(chain, link):
+    """fr3_link1 -> link1, for object names."""
+    prefix = f"{chain['robot']}_"
+    return link[len(prefix):] if link.startswith(prefix) else link
+
+
+# Scene object names the arms had before they were built from the URDF
+# ({prefix}_L1_Frame, {prefix}_Hand_Frame, {prefix}_finger1_mesh, ...).
+# Saved layouts and external scripts look objects up by these, so keep them.
+FRAME_NAMES = {
+    "link0": "L0", "link1": "L1", "link2": "L2", "link3": "L3",
+    "link4": "L4", "link5": "L5", "link6": "L6", "link7": "L7",
+    "link8": "Hand", "hand": "Hand_Actual",
+    "leftfinger": "Finger1", "rightfinger": "Finger2",
+}
+MESH_NAMES = {"leftfinger": "finger1", "rightfinger": "finger2"}
+
+
+def frame_name(chain, link):
+    """Name part of a link's frame empty: fr3_link1 -> L1, fr3_link8 -> Hand."""
+    short = short_link_name(chain, link)
+    return FRAME_NAMES.get(short, short)
+
+
+def mesh_name(chain, link):
+    """Name part of a link's mesh object: fr3_link1 -> link1, fr3_leftfinger -> finger1."""
+    short = short_link_name(chain, link)
+    return MESH_NAMES.get(short, short)
+
+
+# --- Kinematics ---
+
+def rpy_matrix(rpy):
+    """URDF fixed-axis roll/pitch/yaw (same as Blender's XYZ Euler)."""
+    r, p, y = rpy
+    cr, sr = math.cos(r), math.sin(r)
+    cp, sp = math.cos(p), math.sin(p)
+    cy, sy = math.cos(y), math.sin(y)
+    return np.array([
+        [cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr],
+        [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
+        [-sp, cp * sr, cp * cr],
+    ])
+
+
+def origin_matrix(xyz, rpy):
+    m = np.eye(4)
+    m[:3, :3] = rpy_matrix(rpy)
+    m[:3, 3] = xyz
+    return m
+
+
+def actuated_joints(chain):
+    """Names of the joints that take a value in forward_kinematics (no fixed/mimic)."""
+    return [j["name"] for j in chain["joints"]
+            if j["type"] in ("revolute", "continuous", "prismatic") and not j["mimic"]]
+
+
+def _axis_rotations(axis, angles):
+    """Batched Rodrigues rotation, angles (T,) -> (T, 3, 3)."""
+    axis = np.asarray(axis, dtype=np.float64)
+    axis = axis / np.linalg.norm(axis)
+    x, y, z = axis
+    K = np.array([[0, -z, y], [z, 0, -x], [-y, x, 0]])
+    s = np.sin(angles)[:, None, None]
+    c = np.cos(angles)[:, None, None]
+    return np.eye(3) + s * K + (1 - c) * (K @ K)
+
+
+def forward_kinematics(chain, q=None, base=None):
+    """
+    Link transforms for one or many configurations.
+
+    q: (n_dof,) or (T, n_dof) joint values in actuated_joints() order
+       (None = zero pose). base: (4, 4) world matrix of the root link.
+    Returns (n_links, 4, 4) or (T, n_links, 4, 4) world matrices.
+    """
+    names = actuated_joints(chain)
+    single = q is None or np.ndim(q) == 1
+    q = np.zeros((1, len(names))) if q is None else np.atleast_2d(np.asarray(q, dtype=np.float64))
+    T = q.shape[0]
+    values = {name: q[:, i] for i, name in enumerate(names)}
+
+    out = np.empty((T, len(chain["links"]), 4, 4))
+    out[:, 0] = np.eye(4) if base is None else base
+    for j in chain["joints"]:
+        local = np.broadcast_to(origin_matrix(j["xyz"], j["rpy"]), (T, 4, 4)).copy()
+        if j["type"] != "fixed":
+            if j["mimic"]:
+                v = values[j["mimic"]["joint"]] * j["mimic"]["multiplier"] + j["mimic"]["offset"]
+            else:
+                v = values.get(j["name"], np.zeros(T))
+            motion = np.broadcast_to(np.eye(4), (T, 4, 4)).copy()
+            if j["type"] == "prismatic":
+                motion[:, :3, 3] = v[:, None] * np.asarray(j["axis"])
+            else:
+                motion[:, :3, :3] = _axis_rotations(j["axis"], v)
+            local = local @ motion
+        out[:, j["child"]] = out[:, j["parent"]] @ local
+    return out[0] if single else out
@@ -0,0 +1,298 @@
+"""
+Helpers for building scenes without bpy.ops.
+
+Operators like primitive_cube_add, select_all, join and transform_apply each
+scan the view layer and trigger an update, so a scene build that uses them
+gets slower with every object it adds. The helpers here create datablocks
+directly (bmesh / bpy.data), set parents and matrices directly, and link
+objects into the collection of the active build session. The view layer is
+updated once when the session ends.
+
+    with build_session():
+        create_workcell(...)
+"""
+import bpy
+import bmesh
+import os
+import contextlib
+from mathutils import Matrix
+
+import numpy as np
+
+from materials import dedupe_mesh_materials
+
+_current_session = None
+
+# Imported DAE meshes, keyed by absolute file path.
+# Value: (mesh datablock, local matrix of the imported root object)
+_MESH_CACHE = {}
+
+
+class BuildSession:
+    """
+    Collects the objects created during a scene build.
+    """
+    def __init__(self, collection=None):
+        self.view_layer = bpy.context.view_layer
+        self.collection = collection or bpy.context.collection
+        self.objects = []
+        self.deferred = []
+
+    def link(self, obj):
+        self.collection.objects.link(obj)
+        self.objects.append(obj)
+        return obj
+
+    def defer(self, callback):
+        """Runs callback() once when the session ends, before the view-layer update."""
+        if callback not in self.deferred:
+            self.deferred.append(callback)
+
+
+@contextlib.contextmanager
+def build_session(collection=None):
+    """
+    Defers view-layer / depsgraph evaluation until the end of the block.
+    Nested sessions reuse the outer one.
+    """
+    global _current_session
+    if _current_session is not None:
+        yield _current_session
+        return
+
+    session = BuildSession(collection)
+    _current_session = session
+    try:
+        yield session
+        for callback in session.deferred:
+            callback()
+    finally:
+        _current_session = None
+        session.view_layer.update()
+
+
+def current_session():
+    return _current_session
+
+
+def link_object(obj):
+    if _current_session is not None:
+        return _current_session.link(obj)
+    bpy.context.collection.objects.link(obj)
+    return obj
+
+
+def clear_scene():
+    """
+    Removes all objects (replaces select_all + delete).
+    Mesh data is left for orphan purging, so cached meshes stay usable.
+    """
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+
+
+def set_transform(obj, location=(0, 0, 0), rotation=(0, 0, 0), parent=None):
+    # Parent without inverse: location/rotation are relative to the parent,
+    # same as assigning obj.parent after creation
+    if parent is not None:
+        obj.parent = parent
+    obj.location = location
+    obj.rotation_euler = rotation
+    return obj
+
+
+def new_empty(name, location=(0, 0, 0), rotation=(0, 0, 0), parent=None, size=0.05, display='PLAIN_AXES'):
+    obj = bpy.data.objects.new(name, None)
+    obj.empty_display_type = display
+    obj.empty_display_size = size
+    set_transform(obj, location, rotation, parent)
+    return link_object(obj)
+
+
+def new_mesh_object(name, mesh, location=(0, 0, 0), rotation=(0, 0, 0), parent=None, material=None):
+    obj = bpy.data.objects.new(name, mesh)
+    if material is not None and not mesh.materials:
+        mesh.materials.append(material)
+    set_transform(obj, location, rotation, parent)
+    return link_object(obj)
+
+
+def mesh_from_bmesh(bm, name, smooth=False):
+    mesh = bpy.data.meshes.new(name)
+    bm.to_mesh(mesh)
+    bm.free()
+    if smooth:
+        mesh.polygons.foreach_set("use_smooth", [True] * len(mesh.polygons))
+    return mesh
+
+
+def add_box(bm, size, location=(0, 0, 0)):
+    """Adds an axis-aligned box with the given (x, y, z) size to a bmesh."""
+    matrix = Matrix.Translation(location) @ Matrix.Diagonal((size[0], size[1], size[2], 1.0))
+    return bmesh.ops.create_cube(bm, size=1.0, matrix=matrix)["verts"]
+
+
+def add_cylinder(bm, radius, depth, location=(0, 0, 0), segments=32):
+    return bmesh.ops.create_cone(bm, cap_ends=True, segments=segments, radius1=radius, radius2=radius,
+                                 depth=depth, matrix=Matrix.Translation(location), calc_uvs=True)["verts"]
+
+
+def add_uv_sphere(bm, radius, location=(0, 0, 0), segments=32, rings=16):
+    return bmesh.ops.create_uvsphere(bm, u_segments=segments, v_segments=rings, radius=radius,
+                                     matrix=Matrix.Translation(location), calc_uvs=True)["verts"]
+
+
+def new_bmesh():
+    bm = bmesh.new()
+    bm.loops.layers.uv.new("UVMap")
+    return bm
+
+
+def box_mesh(name, size):
+    """Cube primitive with the scale already applied."""
+    bm = new_bmesh()
+    add_box(bm, size)
+    return mesh_from_bmesh(bm, name)
+
+
+def cylinder_mesh(name, radius, depth, segments=32):
+    bm = new_bmesh()
+    add_cylinder(bm, radius, depth, segments=segments)
+    return mesh_from_bmesh(bm, name)
+
+
+def uv_sphere_mesh(name, radius, segments=32, rings=16, smooth=False):
+    bm = new_bmesh()
+    add_uv_sphere(bm, radius, segments=segments, rings=rings)
+    return mesh_from_bmesh(bm, name, smooth=smooth)
+
+
+def new_geometry_group(name):
+    """Empty Geometry Nodes group with one geometry input and output."""
+    group = bpy.data.node_groups.new(name, 'GeometryNodeTree')
+    if hasattr(group, "interface"):
+        # Blender 4.0+
+        group.interface.new_socket("Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+        group.interface.new_socket("Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+    else:
+        group.inputs.new('NodeSocketGeometry', "Geometry")
+        group.outputs.new('NodeSocketGeometry', "Geometry")
+    return group
+
+
+def is_alive(datablock):
+    """
+    False if a cached datablock has been removed from bpy.data
+    (clear_scene, orphan purge, file reload) and must be recreated.
+    """
+    try:
+        datablock.name
+    except ReferenceError:
+        return False
+    return True
+
+
+def _cached_mesh(file_path):
+    entry = _MESH_CACHE.get(file_path)
+    if entry is None:
+        return None
+    if not is_alive(entry[0]):
+        # Mesh was removed (e.g. orphan purge); re-import
+        del _MESH_CACHE[file_path]
+        return None
+    return entry
+
+
+def _import_dae(file_path):
+    """
+    Imports a DAE once and returns its root object with the other
+    imported meshes joined in and the import scale baked into the mesh.
+    """
+    before = set(bpy.data.objects)
+    bpy.ops.wm.collada_import(filepath=file_path)
+    imported = [o for o in bpy.data.objects if o not in before]
+    meshes = [o for o in imported if o.type == 'MESH']
+    if not meshes:
+        for obj in imported:
+            bpy.data.objects.remove(obj, do_unlink=True)
+        return None
+
+    root_obj = meshes[0]
+    if len(meshes) > 1:
+        with bpy.context.temp_override(active_object=root_obj, selected_editable_objects=meshes):
+            bpy.ops.object.join()
+    for obj in imported:
+        if obj is not root_obj and obj.name in bpy.data.objects:
+            bpy.data.objects.remove(obj, do_unlink=True)
+
+    # Apply Scale ONLY (0.001 -> 1.0), keep the DAE location/rotation offset
+    # on the object so it stays relative to the link frame
+    root_obj.parent = None
+    root_obj.data.transform(Matrix.Diagonal((*root_obj.scale, 1.0)))
+    root_obj.scale = (1, 1, 1)
+
+    # DAE files bring their own copies of shared materials/images
+    dedupe_mesh_materials(root_obj.data)
+
+    # Move it out of wherever the importer linked it
+    for coll in list(root_obj.users_collection):
+        coll.objects.unlink(root_obj)
+    return root_obj
+
+
+def load_dae_mesh(file_path):
+    """
+    Returns (mesh, local matrix) for a DAE file, importing it on first use.
+    The local matrix is the DAE root offset relative to the link frame.
+    """
+    file_path = os.path.abspath(file_path)
+    entry = _cached_mesh(file_path)
+    if entry is None:
+        root_obj = _import_dae(file_path)
+        if root_obj is None:
+            return None
+        entry = (root_obj.data, root_obj.matrix_basis.copy())
+        _MESH_CACHE[file_path] = entry
+        # Only the mesh is kept; objects are created per placement
+        bpy.data.objects.remove(root_obj)
+    return entry
+
+
+def mesh_to_numpy(mesh, matrix=None):
+    """
+    Returns (vertex coordinates (N, 3), triangle vertex indices (M, 3)),
+    with `matrix` applied to the coordinates if given.
+    """
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", co)
+    co = co.reshape(-1, 3)
+
+    mesh.calc_loop_triangles()
+    tris = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int64)
+    mesh.loop_triangles.foreach_get("vertices", tris)
+    tris = tris.reshape(-1, 3)
+
+    if matrix is not None:
+        m = np.array(matrix, dtype=np.float64)
+        co = co @ m[:3, :3].T + m[:3, 3]
+    return co, tris
+
+
+def import_mesh_instance(file_path, name, parent=None):
+    """
+    Places a DAE mesh under `parent`.
+    The file is imported on first use; later calls share its mesh datablock.
+    """
+    if not os.path.exists(file_path):
+        print(f"Warning: Mesh not found: {file_path}")
+        return None
+
+    entry = load_dae_mesh(file_path)
+    if entry is None:
+        return None
+
+    obj = bpy.data.objects.new(name, entry[0])
+    link_object(obj)
+    obj.parent = parent
+    obj.matrix_basis = entry[1]
+    return obj
@@ -0,0 +1,367 @@
+"""
+Diff and validate generated layouts.
+
+Each scene is reduced to a snapshot: per object its local transform, world
+matrix and bounding box, a content hash of its mesh and its materials, keyed
+by object name. Two snapshots are compared by name (linear, no pairwise
+matching) and reported as added / removed / moved / changed objects.
+
+Each scene is also checked for geometric problems, using a uniform grid over
+the floor plan as spatial index so only nearby objects are tested:
+- table tops intersecting gantry legs
+- drop struts with no gantry beam at their top
+- arm link meshes penetrating table tops
+
+    blender -b -P scene_diff.py -- old.blend new.blend --json diff.json --save-snapshots
+    python scene_diff.py old.snapshot.json new.snapshot.json
+"""
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from collections import defaultdict
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:
+    # Plain Python: snapshots (.json) only
+    bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from script_args import script_argv
+
+SNAPSHOT_VERSION = 1
+
+# Transform changes below these count as unchanged
+LOCATION_TOL = 1e-4
+MATRIX_TOL = 1e-4
+# Overlap / penetration depth (m) that counts as a clash; touching is fine
+CLASH_TOL = 0.005
+# Cell size (m) of the floor-plan spatial index
+INDEX_CELL = 1.0
+
+TABLE = re.compile(r"^TableTop_")
+LEG = re.compile(r"^Gantry_Leg_")
+BEAM = re.compile(r"^Gantry_Beam_")
+STRUT = re.compile(r"^Strut_")
+ARM_MESH = re.compile(r"^R_.+_mesh(_\d+)?(\.\d+)?$")
+
+
+# --- Snapshots (Blender side) ---
+
+def mesh_hash(mesh):
+    """Content hash of a mesh: rounded vertex positions and face topology."""
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", co)
+    loops = np.empty(len(mesh.loops), dtype=np.int64)
+    mesh.loops.foreach_get("vertex_index", loops)
+    sizes = np.empty(len(mesh.polygons), dtype=np.int64)
+    mesh.polygons.foreach_get("loop_total", sizes)
+
+    digest = hashlib.sha1()
+    digest.update(np.round(co, 6).astype(np.float32).tobytes())
+    digest.update(loops.tobytes())
+    digest.update(sizes.tobytes())
+    return digest.hexdigest()
+
+
+def world_bbox(obj):
+    """World-space AABB (xmin, ymin, zmin, xmax, ymax, zmax) of an object's bound box."""
+    corners = np.array([tuple(c) for c in obj.bound_box], dtype=np.float64)
+    m = np.array(obj.matrix_world, dtype=np.float64)
+    corners = corners @ m[:3, :3].T + m[:3, 3]
+    return [*corners.min(axis=0), *corners.max(axis=0)]
+
+
+def snapshot_scene(scene=None):
+    """
+    Returns {"version", "file", "objects": {name: record}} for the scene.
+    Meshes shared by many objects are hashed once.
+    """
+    scene = scene or bpy.context.scene
+    hashes = {}
+    objects = {}
+    for obj in scene.objects:
+        record = {
+            "type": obj.type,
+            "parent": obj.parent.name if obj.parent else None,
+            "location": list(obj.location),
+            "rotation": list(obj.rotation_euler),
+            "scale": list(obj.scale),
+            "matrix": [v for row in obj.matrix_world for v in row],
+            "data": obj.data.name if obj.data else None,
+            "mesh": None,
+            "materials": [slot.material.name if slot.material else None for slot in obj.material_slots],
+            "bbox": None,
+        }
+        if obj.type == 'MESH':
+            key = obj.data.as_pointer()
+            if key not in hashes:
+                hashes[key] = mesh_hash(obj.data)
+            record["mesh"] = hashes[key]
+            record["bbox"] = world_bbox(obj)
+        objects[obj.name] = record
+    return {"version": SNAPSHOT_VERSION, "file": bpy.data.filepath, "objects": objects}
+
+
+def world_vertices(name):
+    """World-space vertex positions of a mesh object in the open scene."""
+    from scene_build import mesh_to_numpy
+    obj = bpy.data.objects[name]
+    co, _tris = mesh_to_numpy(obj.data, obj.matrix_world)
+    return co
+
+
+def save_snapshot(snapshot, path):
+    with open(path, "w") as f:
+        json.dump(snapshot, f)
+    return path
+
+
+def load_snapshot(path):
+    with open(path) as f:
+        snapshot = json.load(f)
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"{path}: snapshot version {snapshot.get('version')}, expected {SNAPSHOT_VERSION}")
+    return snapshot
+
+
+# --- Diff ---
+
+def diff_snapshots(old, new):
+    """
+    Name-keyed comparison. Returns a dict of lists:
+    added, removed, moved (own transform changed), reparented, retyped,
+    mesh_changed, materials_changed.
+    """
+    a, b = old["objects"], new["objects"]
+    common = sorted(a.keys() & b.keys())
+    result = {
+        "added": sorted(b.keys() - a.keys()),
+        "removed": sorted(a.keys() - b.keys()),
+        "moved": [],
+        "reparented": [],
+        "retyped": [],
+        "mesh_changed": [],
+        "materials_changed": [],
+    }
+    if not common:
+        return result
+
+    # Local transforms of all common objects compared at once
+    def stack(objects, key):
+        return np.array([objects[name][key] for name in common], dtype=np.float64)
+
+    delta = stack(b, "location") - stack(a, "location")
+    shift = np.linalg.norm(delta, axis=1)
+    turned = np.abs(stack(b, "rotation") - stack(a, "rotation")).max(axis=1)
+    scaled = np.abs(stack(b, "scale") - stack(a, "scale")).max(axis=1)
+    world = np.abs(stack(b, "matrix") - stack(a, "matrix")).max(axis=1)
+    for i in np.flatnonzero((shift > LOCATION_TOL) | (turned > MATRIX_TOL) | (scaled > MATRIX_TOL)):
+        result["moved"].append({
+            "name": common[i],
+            "delta": [round(float(v), 6) for v in delta[i]],
+            "distance": float(shift[i]),
+            "rotated": bool(turned[i] > MATRIX_TOL),
+            "scaled": bool(scaled[i] > MATRIX_TOL),
+        })
+
+    for name in common:
+        ra, rb = a[name], b[name]
+        if ra["parent"] != rb["parent"]:
+            result["reparented"].append({"name": name, "old": ra["parent"], "new": rb["parent"]})
+        if ra["type"] != rb["type"]:
+            result["retyped"].append({"name": name, "old": ra["type"], "new": rb["type"]})
+        elif ra["mesh"] != rb["mesh"]:
+            result["mesh_changed"].append(name)
+        if ra["materials"] != rb["materials"]:
+            result["materials_changed"].append({"name": name, "old": ra["materials"], "new": rb["materials"]})
+
+    # Objects that only moved because a parent did
+    result["moved_with_parent"] = int(np.count_nonzero((world > MATRIX_TOL) & (shift <= LOCATION_TOL)
+                                                       & (turned <= MATRIX_TOL) & (scaled <= MATRIX_TOL)))
+    return result
+
+
+# --- Validation ---
+
+class SpatialIndex:
+    """Uniform grid over the floor plan (x, y); each box is stored in every cell it touches."""
+    def __init__(self, cell=INDEX_CELL):
+        self.cell = cell
+        self.cells = defaultdict(list)
+        self.boxes = {}
+
+    def _cells(self, box):
+        i0, j0 = int(np.floor(box[0] / self.cell)), int(np.floor(box[1] / self.cell))
+        i1, j1 = int(np.floor(box[3] / self.cell)), int(np.floor(box[4] / self.cell))
+        return ((i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1))
+
+    def insert(self, name, box):
+        self.boxes[name] = box
+        for key in self._cells(box):
+            self.cells[key].append(name)
+
+    def query(self, box):
+        """Names whose boxes share a cell with `box` (candidates, not exact hits)."""
+        found = set()
+        for key in self._cells(box):
+            found.update(self.cells.get(key, ()))
+        return found
+
+
+def overlap_depth(a, b):
+    """Smallest per-axis overlap of two AABBs (negative if they are apart)."""
+    return min(min(a[k + 3], b[k + 3]) - max(a[k], b[k]) for k in range(3))
+
+
+def build_index(objects, pattern, cell=INDEX_CELL):
+    index = SpatialIndex(cell)
+    for name, record in objects.items():
+        if record["bbox"] and pattern.match(name):
+            index.insert(name, record["bbox"])
+    return index
+
+
+def validate(snapshot, vertices=None, tol=CLASH_TOL, cell=INDEX_CELL):
+    """
+    Geometric checks on one snapshot. Returns a list of issue dicts
+    ({"check", "objects", "detail"}).
+    vertices(name) -> (N, 3) world vertices refines the arm/table check
+    (inside Blender); without it, box overlap alone is reported.
+    """
+    objects = snapshot["objects"]
+    tables = build_index(objects, TABLE, cell)
+    legs = build_index(objects, LEG, cell)
+    beams = build_index(objects, BEAM, cell)
+    issues = []
+
+    # Tables vs gantry legs
+    for table, box in tables.boxes.items():
+        for leg in sorted(legs.query(box)):
+            depth = overlap_depth(box, legs.boxes[leg])
+            if depth > tol:
+                issues.append({"check": "table_leg", "objects": [table, leg],
+                               "detail": f"overlap {depth * 1000:.0f} mm"})
+
+    # Struts need a beam at their top
+    for name, record in objects.items():
+        if not (record["bbox"] and STRUT.match(name)):
+            continue
+        box = record["bbox"]
+        top = [(box[0] + box[3]) / 2, (box[1] + box[4]) / 2, box[5]]
+        probe = [top[0] - tol, top[1] - tol, top[2] - tol, top[0] + tol, top[1] + tol, top[2] + tol]
+        if not any(overlap_depth(probe, beams.boxes[beam]) >= 0 for beam in beams.query(probe)):
+            issues.append({"check": "strut_beam", "objects": [name],
+                           "detail": f"no beam at ({top[0]:.3f}, {top[1]:.3f}, {top[2]:.3f})"})
+
+    # Arm links vs table tops
+    for name, record in objects.items():
+        if not (record["bbox"] and ARM_MESH.match(name)):
+            continue
+        box = record["bbox"]
+        for table in sorted(tables.query(box)):
+            table_box = tables.boxes[table]
+            depth = overlap_depth(box, table_box)
+            if depth <= tol:
+                continue
+            if vertices is None:
+                issues.append({"check": "arm_table", "objects": [name, table],
+                               "detail": f"bounding boxes overlap {depth * 1000:.0f} mm"})
+                continue
+            co = vertices(name)
+            lo = np.array(table_box[:3]) + tol
+            hi = np.array(table_box[3:]) - tol
+            inside = int(np.count_nonzero(np.all((co > lo) & (co < hi), axis=1)))
+            if inside:
+                issues.append({"check": "arm_table", "objects": [name, table],
+                               "detail": f"{inside} vertices inside the table"})
+    return issues
+
+
+def issue_key(issue):
+    return (issue["check"], tuple(issue["objects"]))
+
+
+# --- Reporting ---
+
+def print_diff(diff, old_issues, new_issues):
+    print(f"Added:   {len(diff['added'])}")
+    for name in diff["added"]:
+        print(f"  + {name}")
+    print(f"Removed: {len(diff['removed'])}")
+    for name in diff["removed"]:
+        print(f"  - {name}")
+    print(f"Moved:   {len(diff['moved'])} (+{diff.get('moved_with_parent', 0)} moved with their parent)")
+    for move in diff["moved"]:
+        extra = " rotated" if move["rotated"] else ""
+        extra += " scaled" if move["scaled"] else ""
+        print(f"  ~ {move['name']}: {tuple(round(v, 4) for v in move['delta'])}{extra}")
+    for key, label in (("reparented", "Reparented"), ("retyped", "Type changed"), ("materials_changed", "Materials")):
+        if diff[key]:
+            print(f"{label}: {len(diff[key])}")
+            for change in diff[key]:
+                print(f"  * {change['name']}: {change['old']} -> {change['new']}")
+    if diff["mesh_changed"]:
+        print(f"Mesh changed: {len(diff['mesh_changed'])}")
+        for name in diff["mesh_changed"]:
+            print(f"  * {name}")
+
+    old_keys = {issue_key(i) for i in old_issues}
+    new_keys = {issue_key(i) for i in new_issues}
+    print(f"Validation: {len(new_issues)} issues ({len(new_keys - old_keys)} new, {len(old_keys - new_keys)} resolved)")
+    for issue in new_issues:
+        tag = "NEW " if issue_key(issue) not in old_keys else "    "
+        print(f"  {tag}[{issue['check']}] {' / '.join(issue['objects'])}: {issue['detail']}")
+
+
+def load_scene(path, save=False):
+    """
+    Returns (snapshot, issues) for a .blend (opened in Blender) or a saved
+    snapshot .json.
+    """
+    if path.endswith(".json"):
+        snapshot = load_snapshot(path)
+        return snapshot, validate(snapshot)
+    if bpy is None:
+        raise SystemExit(f"{path}: .blend files need Blender; pass snapshot .json files instead")
+    bpy.ops.wm.open_mainfile(filepath=os.path.abspath(path))
+    snapshot = snapshot_scene()
+    # Validate while the file is open so the arm check can use vertices
+    issues = validate(snapshot, vertices=world_vertices)
+    if save:
+        out = save_snapshot(snapshot, os.path.splitext(path)[0] + ".snapshot.json")
+        print(f"Saved snapshot {out}")
+    return snapshot, issues
+
+
+def parse_args(argv):
+    argv = script_argv(argv)
+    parser = argparse.ArgumentParser(description="Diff and validate two layouts")
+    parser.add_argument("old", help=".blend or snapshot .json")
+    parser.add_argument("new", help=".blend or snapshot .json")
+    parser.add_argument("--json", help="Write the diff and issues to this file")
+    parser.add_argument("--save-snapshots", action="store_true", help="Write <file>.snapshot.json next to each .blend")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv if argv is None else argv)
+    old, old_issues = load_scene(args.old, args.save_snapshots)
+    new, new_issues = load_scene(args.new, args.save_snapshots)
+
+    diff = diff_snapshots(old, new)
+    print_diff(diff, old_issues, new_issues)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"diff": diff, "old_issues": old_issues, "issues": new_issues}, f, indent=2)
+        print(f"Saved {args.json}")
+    return 1 if new_issues else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+"""
+Command-line helpers for scripts that run both inside Blender
+(blender -b file.blend -P script.py -- args) and from plain Python
+(python script.py args).
+"""
+import sys
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+
+def script_argv(argv=None):
+    """
+    The script's own arguments: everything after "--" if present, otherwise
+    argv[1:] from plain Python and nothing inside Blender (those are all
+    Blender's own).
+    """
+    argv = sys.argv if argv is None else argv
+    if "--" in argv:
+        return argv[argv.index("--") + 1:]
+    return [] if bpy is not None else argv[1:]
+
+
+def need_blender(alternative=None):
+    """Stops a script that needs the open scene but was run from plain Python."""
+    if bpy is None:
+        raise SystemExit(f"Run inside Blender or pass {alternative}" if alternative else "Run inside Blender")
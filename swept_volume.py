@@ -0,0 +1,383 @@
+"""
+Swept volume of an arm over a trajectory.
+
+Runs the arm's link chain (robot_description.forward_kinematics) over all
+trajectory samples in one batch, transforms surface samples of every link
+mesh and rasterizes them into a voxel occupancy grid. Time steps are
+processed in chunks on a thread pool (NumPy releases the GIL for the heavy
+array maths).
+
+Results are saved as .npz (occupancy, origin, voxel_size) and can be turned
+into a Blender mesh or compared with another arm's sweep.
+
+Usage (inside Blender, on a generated scene):
+    blender -b optics_table.blend -P swept_volume.py -- --arm R_Susp_1_1 --trajectory traj.npy
+"""
+import os
+import sys
+import math
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:
+    # Voxelization / comparison also work from plain Python
+    bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import robot_description
+from script_args import script_argv, need_blender
+
+VOXEL_SIZE = 0.02   # m
+MARGIN = 0.3        # m, grid padding around the reach sphere (covers the hand and fingers)
+REACH = 0.855       # m, FR3 reach, measured from the shoulder (joint 2)
+CHUNK_FLOATS = 8_000_000  # working-set limit per chunk (~64 MB of float64)
+
+
+class SweptVolume:
+    """
+    Voxel occupancy grid. Voxel (i, j, k) covers
+    origin + voxel_size * [i, i+1) x [j, j+1) x [k, k+1).
+    """
+    def __init__(self, occupancy, origin, voxel_size):
+        self.occupancy = occupancy
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.voxel_size = float(voxel_size)
+
+    @property
+    def volume(self):
+        return float(np.count_nonzero(self.occupancy)) * self.voxel_size ** 3
+
+    def save(self, path):
+        np.savez_compressed(path, occupancy=self.occupancy, origin=self.origin, voxel_size=self.voxel_size)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data["occupancy"], data["origin"], float(data["voxel_size"]))
+
+
+def grid_for_bounds(lo, hi, voxel_size=VOXEL_SIZE):
+    """Empty grid covering the box [lo, hi], snapped to the voxel lattice."""
+    origin = np.floor(np.asarray(lo) / voxel_size) * voxel_size
+    shape = tuple(int(n) for n in np.ceil((np.asarray(hi) - origin) / voxel_size) + 1)
+    return SweptVolume(np.zeros(shape, dtype=bool), origin, voxel_size)
+
+
+def grid_for_base(base, chain=None, voxel_size=VOXEL_SIZE, reach=REACH, margin=MARGIN):
+    """
+    Empty grid covering the reach sphere around the shoulder (the first
+    joint's origin, 0.333 m above the base on FR3), plus margin.
+    """
+    base = np.asarray(base, dtype=np.float64)
+    shoulder = np.array(chain["joints"][0]["xyz"] if chain else (0.0, 0.0, 0.333))
+    center = base[:3, :3] @ shoulder + base[:3, 3]
+    half = reach + margin
+    return grid_for_bounds(center - half, center + half, voxel_size)
+
+
+def grid_for_sweep(transforms, items, voxel_size=VOXEL_SIZE):
+    """
+    Grid that is guaranteed to hold every sample: each link's origin over the
+    trajectory, padded by the radius of its samples around the link frame.
+    transforms: (T, L, 4, 4); items: [(link index, (M, 3) points)].
+    """
+    lo, hi = [], []
+    for li, pts in items:
+        radius = np.linalg.norm(pts, axis=1).max()
+        origins = transforms[:, li, :3, 3]
+        lo.append(origins.min(axis=0) - radius)
+        hi.append(origins.max(axis=0) + radius)
+    return grid_for_bounds(np.min(lo, axis=0) - voxel_size, np.max(hi, axis=0) + voxel_size, voxel_size)
+
+
+def sample_surface(co, tris, spacing):
+    """
+    Points on a triangle mesh, no further apart than `spacing`.
+    Uses a regular barycentric grid per triangle, grouped by grid resolution.
+    """
+    if len(tris) == 0:
+        return co
+    a, b, c = co[tris[:, 0]], co[tris[:, 1]], co[tris[:, 2]]
+    longest = np.max(np.stack([np.linalg.norm(b - a, axis=1),
+                               np.linalg.norm(c - b, axis=1),
+                               np.linalg.norm(a - c, axis=1)]), axis=0)
+    steps = np.maximum(1, np.ceil(longest / spacing)).astype(np.int64)
+
+    points = [co]
+    for k in np.unique(steps):
+        sel = steps == k
+        i, j = np.meshgrid(np.arange(k + 1), np.arange(k + 1), indexing="ij")
+        mask = i + j <= k
+        u = i[mask] / k
+        v = j[mask] / k
+        w = 1.0 - u - v
+        # (n_tri, n_bary, 3)
+        p = (w[None, :, None] * a[sel][:, None] + u[None, :, None] * b[sel][:, None]
+             + v[None, :, None] * c[sel][:, None])
+        points.append(p.reshape(-1, 3))
+    return np.concatenate(points)
+
+
+def _rasterize(grid, points):
+    """
+    Flat indices of the voxels containing `points` (any leading shape, last
+    dim 3), and the number of points that fell outside the grid.
+    """
+    idx = np.floor((points.reshape(-1, 3) - grid.origin) / grid.voxel_size).astype(np.int64)
+    shape = np.array(grid.occupancy.shape)
+    inside = np.all((idx >= 0) & (idx < shape), axis=1)
+    flat = np.ravel_multi_index(idx[inside].T, grid.occupancy.shape)
+    return np.unique(flat), int(len(inside) - np.count_nonzero(inside))
+
+
+def sweep(chain, trajectory, link_points, base=None, grid=None, voxel_size=VOXEL_SIZE, threads=None):
+    """
+    Swept volume of an arm.
+
+    chain: compiled chain from robot_description.load_robot()
+    trajectory: (T, n_dof) joint values in actuated_joints() order
+    link_points: link name -> (M, 3) surface samples in the link frame
+    base: (4, 4) world matrix of the root link
+    grid: optional fixed grid (e.g. to share one lattice between arms); by
+    default the grid is sized from the actual link positions
+    Returns a SweptVolume. Samples outside a given grid raise ValueError.
+    """
+    base = np.eye(4) if base is None else np.asarray(base, dtype=np.float64)
+    trajectory = np.atleast_2d(np.asarray(trajectory, dtype=np.float64))
+
+    transforms = robot_description.forward_kinematics(chain, trajectory, base)  # (T, L, 4, 4)
+    link_index = {name: i for i, name in enumerate(chain["links"])}
+    items = [(link_index[name], pts) for name, pts in link_points.items() if len(pts)]
+    if not items:
+        return grid if grid is not None else grid_for_base(base, chain, voxel_size)
+    if grid is None:
+        grid = grid_for_sweep(transforms, items, voxel_size)
+
+    largest = max(len(pts) for _, pts in items)
+    chunk = max(1, CHUNK_FLOATS // (largest * 3))
+    chunks = [(start, min(start + chunk, len(trajectory))) for start in range(0, len(trajectory), chunk)]
+
+    def run(bounds):
+        start, end = bounds
+        hits, outside = [], 0
+        for li, pts in items:
+            m = transforms[start:end, li]          # (t, 4, 4)
+            world = pts @ m[:, :3, :3].transpose(0, 2, 1) + m[:, None, :3, 3]
+            flat, dropped = _rasterize(grid, world)
+            hits.append(flat)
+            outside += dropped
+        return np.unique(np.concatenate(hits)), outside
+
+    total_outside = 0
+    with ThreadPoolExecutor(max_workers=threads or os.cpu_count()) as pool:
+        for flat, outside in pool.map(run, chunks):
+            grid.occupancy.flat[flat] = True
+            total_outside += outside
+    if total_outside:
+        # Dropping them would under-report volumes and overlaps
+        raise ValueError(f"{total_outside} swept samples fall outside the grid; use a larger grid "
+                         "or let sweep() size it")
+    return grid
+
+
+def fill_interior(grid):
+    """Fills enclosed cavities (needs SciPy; returns the grid unchanged without it)."""
+    try:
+        from scipy import ndimage
+    except ImportError:
+        print("SciPy not available, sweep left as a shell")
+        return grid
+    grid.occupancy = ndimage.binary_fill_holes(grid.occupancy)
+    return grid
+
+
+def compare_sweeps(a, b):
+    """
+    Overlap between two sweeps on the same voxel size.
+    Returns (overlapping voxel count, overlap volume in m^3).
+    """
+    if not math.isclose(a.voxel_size, b.voxel_size):
+        raise ValueError("Sweeps must use the same voxel size")
+    shift = np.round((b.origin - a.origin) / a.voxel_size).astype(np.int64)
+
+    # Overlapping index range, in a's voxel coordinates
+    lo = np.maximum(0, shift)
+    hi = np.minimum(a.occupancy.shape, shift + np.array(b.occupancy.shape))
+    if np.any(hi <= lo):
+        return 0, 0.0
+    sa = a.occupancy[lo[0]:hi[0], lo[1]:hi[1], lo[2]:hi[2]]
+    sb = b.occupancy[lo[0] - shift[0]:hi[0] - shift[0],
+                     lo[1] - shift[1]:hi[1] - shift[1],
+                     lo[2] - shift[2]:hi[2] - shift[2]]
+    count = int(np.count_nonzero(sa & sb))
+    return count, count * a.voxel_size ** 3
+
+
+def interpolate_trajectory(waypoints, samples_per_segment=20):
+    """Linear interpolation between joint-space waypoints (W, n_dof) -> (T, n_dof)."""
+    waypoints = np.atleast_2d(np.asarray(waypoints, dtype=np.float64))
+    if len(waypoints) == 1:
+        return waypoints
+    t = np.linspace(0, 1, samples_per_segment, endpoint=False)
+    segments = [a + t[:, None] * (b - a) for a, b in zip(waypoints[:-1], waypoints[1:])]
+    return np.concatenate(segments + [waypoints[-1:]])
+
+
+def random_trajectory(chain, samples, seed=0):
+    """Uniform random configurations within the joint limits (workspace sweep)."""
+    rng = np.random.default_rng(seed)
+    joints = {j["name"]: j for j in chain["joints"]}
+    names = robot_description.actuated_joints(chain)
+    lower = np.array([joints[n]["lower"] for n in names])
+    upper = np.array([joints[n]["upper"] for n in names])
+    return rng.uniform(lower, upper, (samples, len(names)))
+
+
+# --- Blender side ---
+
+def link_points_from_blender(chain, spacing=VOXEL_SIZE / 2):
+    """
+    Surface samples for every link with a visual mesh, in the link frame.
+    Meshes come from the scene_build DAE cache.
+    """
+    from scene_build import load_dae_mesh, mesh_to_numpy
+
+    points = {}
+    for link, visuals in chain["visuals"].items():
+        parts = []
+        for visual in visuals:
+            if not os.path.exists(visual["mesh"]):
+                continue
+            entry = load_dae_mesh(visual["mesh"])
+            if entry is None:
+                continue
+            mesh, local = entry
+            visual_origin = robot_description.origin_matrix(visual["xyz"], visual["rpy"])
+            co, tris = mesh_to_numpy(mesh, visual_origin @ np.array(local))
+            parts.append(sample_surface(co, tris, spacing))
+        if parts:
+            points[link] = np.concatenate(parts)
+    return points
+
+
+def base_from_scene(name_prefix, chain):
+    """World matrix of an arm's root frame, as built by create_franka_arm."""
+    root = robot_description.frame_name(chain, chain["links"][0])
+    frame = bpy.data.objects[f"{name_prefix}_{root}_Frame"]
+    bpy.context.view_layer.update()
+    return np.array(frame.matrix_world)
+
+
+def occupancy_faces(occupancy):
+    """
+    Boundary quads of a voxel grid (faces between occupied and empty voxels).
+    Returns (vertices (4F, 3) in voxel units, faces (F, 4)).
+    """
+    padded = np.pad(occupancy, 1)
+    corners = {
+        # axis, direction -> quad corners relative to the voxel's min corner
+        (0, 1): [(1, 0, 0), (1, 1, 0), (1, 1, 1), (1, 0, 1)],
+        (0, -1): [(0, 0, 0), (0, 0, 1), (0, 1, 1), (0, 1, 0)],
+        (1, 1): [(0, 1, 0), (0, 1, 1), (1, 1, 1), (1, 1, 0)],
+        (1, -1): [(0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1)],
+        (2, 1): [(0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)],
+        (2, -1): [(0, 0, 0), (0, 1, 0), (1, 1, 0), (1, 0, 0)],
+    }
+    verts = []
+    for (axis, direction), quad in corners.items():
+        neighbour = np.roll(padded, -direction, axis=axis)[1:-1, 1:-1, 1:-1]
+        cells = np.argwhere(occupancy & ~neighbour)
+        if len(cells):
+            verts.append((cells[:, None, :] + np.array(quad)[None]).reshape(-1, 3))
+    if not verts:
+        return np.zeros((0, 3)), np.zeros((0, 4), dtype=np.int64)
+    verts = np.concatenate(verts).astype(np.float64)
+    faces = np.arange(len(verts)).reshape(-1, 4)
+    return verts, faces
+
+
+def sweep_to_mesh(grid, name="Swept_Volume"):
+    """Creates a Blender object showing the occupied voxels' outer faces."""
+    from scene_build import new_mesh_object
+    from materials import get_material
+
+    verts, faces = occupancy_faces(grid.occupancy)
+    verts = verts * grid.voxel_size + grid.origin
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set("co", verts.astype(np.float32).ravel())
+    mesh.loops.add(faces.size)
+    mesh.loops.foreach_set("vertex_index", faces.astype(np.int32).ravel())
+    mesh.polygons.add(len(faces))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, faces.size, 4, dtype=np.int32))
+    if bpy.app.version < (4, 0, 0):
+        # Older versions also need the per-face corner count
+        mesh.polygons.foreach_set("loop_total", np.full(len(faces), 4, dtype=np.int32))
+    mesh.update()
+    mesh.validate()
+    return new_mesh_object(name, mesh, material=get_material("Sweep_Mat"))
+
+
+def parse_args(argv):
+    argv = script_argv(argv)
+    parser = argparse.ArgumentParser(description="Swept volume of an arm over a trajectory")
+    parser.add_argument("--arm", required=True, help="Arm name prefix, e.g. R_Susp_1_1")
+    parser.add_argument("--trajectory", help=".npy or .csv of joint values (T x n_dof), or waypoints with --interpolate")
+    parser.add_argument("--interpolate", type=int, default=0, help="Samples per waypoint segment")
+    parser.add_argument("--samples", type=int, default=2000, help="Random configurations when no trajectory is given")
+    parser.add_argument("--voxel", type=float, default=VOXEL_SIZE)
+    parser.add_argument("--fill", action="store_true", help="Fill enclosed cavities (SciPy)")
+    parser.add_argument("--out", help="Output .npz (default sweep_<arm>.npz)")
+    parser.add_argument("--compare", nargs="*", default=[], help="Other sweeps (.npz) to check for overlap")
+    parser.add_argument("--no-mesh", action="store_true", help="Don't add the voxel mesh to the scene")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    import time
+
+    args = parse_args(sys.argv if argv is None else argv)
+    # The arm's base and link meshes come from the open scene
+    need_blender()
+    chain = robot_description.load_robot()
+
+    if args.trajectory:
+        if args.trajectory.endswith(".csv"):
+            trajectory = np.loadtxt(args.trajectory, delimiter=",", ndmin=2)
+        else:
+            trajectory = np.load(args.trajectory)
+        if args.interpolate:
+            trajectory = interpolate_trajectory(trajectory, args.interpolate)
+    else:
+        trajectory = random_trajectory(chain, args.samples)
+
+    t0 = time.perf_counter()
+    base = base_from_scene(args.arm, chain)
+    link_points = link_points_from_blender(chain, spacing=args.voxel / 2)
+    t1 = time.perf_counter()
+    grid = sweep(chain, trajectory, link_points, base, voxel_size=args.voxel)
+    if args.fill:
+        fill_interior(grid)
+    t2 = time.perf_counter()
+    print(f"Sampled {sum(len(p) for p in link_points.values())} surface points in {t1 - t0:.2f}s")
+    print(f"Swept {len(trajectory)} poses in {t2 - t1:.2f}s: {grid.volume:.3f} m^3")
+
+    out = args.out or f"sweep_{args.arm}.npz"
+    grid.save(out)
+    print(f"Wrote {os.path.abspath(out)}")
+
+    for other_path in args.compare:
+        count, volume = compare_sweeps(grid, SweptVolume.load(other_path))
+        print(f"Overlap with {other_path}: {count} voxels, {volume:.4f} m^3")
+
+    if not args.no_mesh:
+        sweep_to_mesh(grid, f"Swept_Volume_{args.arm}")
+    return grid
+
+if __name__ == "__main__":
+    main()
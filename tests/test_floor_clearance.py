@@ -0,0 +1,46 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import floor_clearance
+
+
+def test_aisles_stay_within_rows():
+    # Two rows of two tables, 1 m aisle in the front row, 0.8 m in the back,
+    # and a 1 m cross aisle between the rows
+    tables = [
+        (0.0, 0.0, 2.0, 1.0), (3.0, 0.0, 5.0, 1.0),
+        (0.0, 2.0, 2.5, 3.0), (3.3, 2.0, 5.0, 3.0),
+    ]
+    aisles = floor_clearance.find_aisles(tables)
+    assert sorted(map(tuple, aisles.tolist())) == [
+        (2.0, 0.0, 3.0, 1.0),
+        (2.5, 2.0, 3.3, 3.0),
+    ]
+
+
+def test_touching_tables_share_a_row():
+    # Front and back tables touch along y: one row, one aisle spanning both
+    tables = [
+        (0.0, 0.0, 2.0, 1.0), (0.0, 1.0, 2.0, 2.0),
+        (3.0, 0.0, 5.0, 2.0),
+    ]
+    aisles = floor_clearance.find_aisles(tables)
+    assert aisles.tolist() == [[2.0, 0.0, 3.0, 2.0]]
+
+
+def test_clearance_map_without_obstacles():
+    result = floor_clearance.clearance_map([], [], max_clearance=2.0, cell_size=0.1)
+    assert result["clearance"].size > 0
+    assert np.all(result["clearance"] == 2.0)
+    assert len(result["aisles"]) == 0
+    assert floor_clearance.aisle_report(result) == []
+
+
+def test_clearance_map_tables_only():
+    result = floor_clearance.clearance_map([], [], [(0.0, 0.0, 1.0, 1.0), (2.0, 0.0, 3.0, 1.0)],
+                                           max_clearance=2.0, cell_size=0.1)
+    assert np.all(result["clearance"] == 2.0)
+    assert len(result["aisles"]) == 1
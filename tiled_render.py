@@ -0,0 +1,286 @@
+"""
+Tiled rendering for very large (poster-size) images.
+
+The frame is split into a grid of border regions. Each tile is rendered by its
+own Blender process (optionally with a memory limit), several at a time, and
+the tiles are stitched into the final PNG one tile row at a time, so neither
+the renderers nor the stitcher ever hold the full image.
+
+Controller (plain Python):
+    python tiled_render.py --blender /path/to/blender --resolution 16384 12288 \\
+        --tiles 8 6 --jobs 4 --output poster.png
+
+Each tile process runs this same file inside Blender with --render-tile.
+"""
+import os
+import sys
+import zlib
+import struct
+import argparse
+import shutil
+import threading
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    # Windows: no --memory-mb
+    resource = None
+
+try:
+    import bpy
+except ImportError:
+    # Controller side
+    bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from script_args import script_argv
+
+# Blender truncates border * resolution to whole pixels; nudging the border a
+# quarter pixel inwards makes the truncation land on the intended edge.
+BORDER_NUDGE = 0.25
+
+
+def tile_edges(size, count):
+    """Pixel edges splitting `size` into `count` nearly equal parts."""
+    return [round(i * size / count) for i in range(count + 1)]
+
+
+def tile_grid(width, height, tiles_x, tiles_y):
+    """
+    Returns tiles as (col, row, x0, y0, x1, y1) in pixels, rows top to bottom.
+    """
+    xs = tile_edges(width, tiles_x)
+    ys = tile_edges(height, tiles_y)
+    return [(c, r, xs[c], ys[r], xs[c + 1], ys[r + 1]) for r in range(tiles_y) for c in range(tiles_x)]
+
+
+class PNGStreamWriter:
+    """
+    Writes an 8-bit RGB/RGBA PNG row by row (filter type 0, streamed zlib).
+    """
+    def __init__(self, path, width, height, channels=4, level=6):
+        self.file = open(path, "wb")
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.rows_written = 0
+        self.compressor = zlib.compressobj(level)
+        color_type = {3: 2, 4: 6}[channels]
+        self.file.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0))
+
+    def _chunk(self, kind, data):
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(kind)
+        self.file.write(data)
+        self.file.write(struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    def write_rows(self, rows):
+        """rows: (n, width, channels) uint8, top to bottom."""
+        rows = np.ascontiguousarray(rows, dtype=np.uint8)
+        filtered = np.zeros((rows.shape[0], 1 + self.width * self.channels), dtype=np.uint8)
+        filtered[:, 1:] = rows.reshape(rows.shape[0], -1)
+        data = self.compressor.compress(filtered.tobytes())
+        if data:
+            self._chunk(b"IDAT", data)
+        self.rows_written += rows.shape[0]
+
+    def close(self):
+        if self.rows_written != self.height:
+            print(f"Warning: wrote {self.rows_written} of {self.height} rows")
+        self._chunk(b"IDAT", self.compressor.flush())
+        self._chunk(b"IEND", b"")
+        self.file.close()
+
+
+def check_tile(pixels, width, height, name="tile"):
+    """Raises if a rendered tile doesn't match its slot (a border off-by-one would shift the image)."""
+    if pixels.shape[:2] != (height, width):
+        raise ValueError(f"{name} is {pixels.shape[1]}x{pixels.shape[0]}, expected {width}x{height}")
+    return pixels
+
+
+def _limit_memory(process, megabytes):
+    """
+    Caps a running tile process's address space. Applied from outside with
+    prlimit: preexec_fn isn't safe with the controller's worker threads.
+    """
+    limit = megabytes * 1024 * 1024
+    try:
+        resource.prlimit(process.pid, resource.RLIMIT_AS, (limit, limit))
+    except ProcessLookupError:
+        # Already exited; its exit code is checked as usual
+        pass
+
+
+def render_tiles(blender, blend_file, width, height, tiles_x, tiles_y, output,
+                 jobs=2, fast=False, samples=None, memory_mb=None, keep_tiles=False, tile_dir=None):
+    """
+    Renders and stitches the full image. Returns the output path.
+    The PNG is written to <output>.part and renamed when complete; on the
+    first failed tile the remaining tiles are cancelled and the partial
+    file is removed.
+    """
+    if memory_mb and not hasattr(resource, "prlimit"):
+        raise RuntimeError("--memory-mb needs resource.prlimit (Linux)")
+    own_tile_dir = tile_dir is None
+    tile_dir = tile_dir or tempfile.mkdtemp(prefix="tiles_")
+    os.makedirs(tile_dir, exist_ok=True)
+    script = os.path.abspath(__file__)
+    grid = tile_grid(width, height, tiles_x, tiles_y)
+
+    failed = threading.Event()
+    running = set()
+    lock = threading.Lock()
+
+    def run(tile):
+        col, row, x0, y0, x1, y1 = tile
+        if failed.is_set():
+            return None
+        out = os.path.join(tile_dir, f"tile_{row:03d}_{col:03d}.npy")
+        command = [blender, "-b", os.path.abspath(blend_file), "-P", script, "--",
+                   "--render-tile", str(x0), str(y0), str(x1), str(y1),
+                   "--resolution", str(width), str(height), "--tile-output", out]
+        if fast:
+            command.append("--fast")
+        if samples:
+            command += ["--samples", str(samples)]
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        with lock:
+            running.add(process)
+            if failed.is_set():
+                process.kill()
+        try:
+            if memory_mb:
+                _limit_memory(process, memory_mb)
+            log, _ = process.communicate()
+        finally:
+            with lock:
+                running.discard(process)
+        if failed.is_set():
+            return None
+        if process.returncode != 0 or not os.path.exists(out):
+            raise RuntimeError(f"Tile {col},{row} failed (exit {process.returncode}):\n{log[-2000:]}")
+        return out
+
+    partial = output + ".part"
+    writer = PNGStreamWriter(partial, width, height, channels=4)
+    pool = ThreadPoolExecutor(max_workers=jobs)
+    futures = []
+    try:
+        # Submitted in row-major order, so the top rows finish first
+        futures = [pool.submit(run, tile) for tile in grid]
+        for r in range(tiles_y):
+            row_tiles = [(tile, futures[i]) for i, tile in enumerate(grid) if tile[1] == r]
+            parts = []
+            for (col, _row, x0, y0, x1, y1), future in row_tiles:
+                path = future.result()
+                parts.append(check_tile(np.load(path), x1 - x0, y1 - y0, os.path.basename(path)))
+                if not keep_tiles:
+                    os.remove(path)
+            writer.write_rows(np.concatenate(parts, axis=1))
+            print(f"Stitched tile row {r + 1}/{tiles_y}")
+        writer.close()
+        os.replace(partial, output)
+    except BaseException:
+        # Stop queued tiles and kill the ones still rendering
+        failed.set()
+        for future in futures:
+            future.cancel()
+        with lock:
+            for process in running:
+                process.kill()
+        writer.file.close()
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    finally:
+        pool.shutdown(wait=True)
+        if own_tile_dir and not keep_tiles:
+            shutil.rmtree(tile_dir, ignore_errors=True)
+    return output
+
+
+# --- Tile process (inside Blender) ---
+
+def render_region(x0, y0, x1, y1, width, height, output, fast=False, samples=None):
+    """
+    Renders pixels [x0, x1) x [y0, y1) (y from the top) of a width x height
+    frame and saves them as a top-to-bottom uint8 RGBA .npy.
+    """
+    from render_optics_table import setup_render
+
+    scene = bpy.context.scene
+    setup_render(fast)
+    if samples and not fast:
+        scene.cycles.samples = samples
+    if scene.render.engine == 'CYCLES' and hasattr(scene.cycles, "use_auto_tile"):
+        # Render the region in smaller internal tiles too, to keep buffers small
+        scene.cycles.use_auto_tile = True
+        scene.cycles.tile_size = 512
+
+    render = scene.render
+    render.resolution_x = width
+    render.resolution_y = height
+    render.resolution_percentage = 100
+    render.use_border = True
+    render.use_crop_to_border = True
+    # Border is normalized with y from the bottom
+    render.border_min_x = (x0 + BORDER_NUDGE) / width
+    render.border_max_x = (x1 + BORDER_NUDGE) / width
+    render.border_min_y = (height - y1 + BORDER_NUDGE) / height
+    render.border_max_y = (height - y0 + BORDER_NUDGE) / height
+    render.image_settings.file_format = 'PNG'
+    render.image_settings.color_mode = 'RGBA'
+    render.image_settings.color_depth = '8'
+
+    png = os.path.splitext(output)[0] + ".png"
+    render.filepath = png
+    bpy.ops.render.render(write_still=True)
+
+    # Render Result has no pixels in background mode; read the saved file back
+    image = bpy.data.images.load(png)
+    w, h = image.size
+    pixels = np.empty(w * h * 4, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    bpy.data.images.remove(image)
+    os.remove(png)
+
+    pixels = np.flipud(pixels.reshape(h, w, 4))
+    np.save(output, np.round(pixels * 255).astype(np.uint8))
+    print(f"Tile {x0},{y0}-{x1},{y1}: {w}x{h} -> {output}")
+
+
+def parse_args(argv):
+    argv = script_argv(argv)
+    parser = argparse.ArgumentParser(description="Tiled rendering for large images")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"))
+    parser.add_argument("--blend", default="optics_table.blend")
+    parser.add_argument("--resolution", type=int, nargs=2, default=(8192, 6144))
+    parser.add_argument("--tiles", type=int, nargs=2, default=(4, 4), help="Tiles in x and y")
+    parser.add_argument("--jobs", type=int, default=2, help="Tiles rendered in parallel")
+    parser.add_argument("--memory-mb", type=int, help="Address-space limit per tile process")
+    parser.add_argument("--fast", action="store_true", help="Workbench instead of Cycles")
+    parser.add_argument("--samples", type=int)
+    parser.add_argument("--output", default="optics_table_poster.png")
+    parser.add_argument("--keep-tiles", action="store_true")
+    parser.add_argument("--tile-dir")
+    # Tile process
+    parser.add_argument("--render-tile", type=int, nargs=4, metavar=("X0", "Y0", "X1", "Y1"))
+    parser.add_argument("--tile-output")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv)
+    if args.render_tile:
+        render_region(*args.render_tile, *args.resolution, args.tile_output, fast=args.fast, samples=args.samples)
+    else:
+        path = render_tiles(args.blender, args.blend, *args.resolution, *args.tiles, args.output,
+                            jobs=args.jobs, fast=args.fast, samples=args.samples, memory_mb=args.memory_mb,
+                            keep_tiles=args.keep_tiles, tile_dir=args.tile_dir)
+        print(f"Wrote {os.path.abspath(path)}")
@@ -0,0 +1,136 @@
+"""
+Command-line client for blender_worker.py (plain Python, no bpy needed).
+
+    python worker_client.py start --blender /path/to/blender
+    python worker_client.py build --save optics_table.blend --reach-mode points
+    python worker_client.py render --fast --output preview.png
+    python worker_client.py render_views iso top front --threads 8
+    python worker_client.py inspect
+    python worker_client.py shutdown
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import subprocess
+
+DEFAULT_PORT = 8765
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blender_worker.py")
+
+
+def send(cmd, args=None, port=DEFAULT_PORT, host="127.0.0.1", timeout=None):
+    """Sends one command and returns the worker's response dict."""
+    with socket.create_connection((host, port), timeout=timeout) as conn:
+        stream = conn.makefile("rw", encoding="utf-8")
+        stream.write(json.dumps({"cmd": cmd, "args": args or {}}) + "\n")
+        stream.flush()
+        line = stream.readline()
+    if not line:
+        raise ConnectionError("Worker closed the connection")
+    return json.loads(line)
+
+
+def start_worker(blender="blender", port=DEFAULT_PORT, open_file=None, wait=60.0):
+    """Starts a worker in the background and waits until it answers ping."""
+    command = [blender, "-b", "-P", WORKER_SCRIPT, "--", "--port", str(port)]
+    if open_file:
+        command += ["--open", open_file]
+    process = subprocess.Popen(command, cwd=os.getcwd())
+
+    deadline = time.time() + wait
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Worker exited with code {process.returncode}")
+        try:
+            return send("ping", port=port, timeout=2.0)
+        except OSError:
+            time.sleep(0.25)
+    raise TimeoutError(f"Worker did not answer on port {port} within {wait}s")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Client for the persistent Blender worker")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    start = sub.add_parser("start", help="Start a worker in the background")
+    start.add_argument("--blender", default=os.environ.get("BLENDER", "blender"))
+    start.add_argument("--open", help=".blend to load at startup")
+
+    sub.add_parser("ping")
+    sub.add_parser("shutdown")
+
+    open_ = sub.add_parser("open", help="Load a .blend")
+    open_.add_argument("path")
+
+    build = sub.add_parser("build", help="Rebuild the layout")
+    build.add_argument("--save", help="Save to this .blend after building")
+    build.add_argument("--compress", action="store_true")
+    build.add_argument("--reach-mode", choices=["sphere", "instanced", "points"])
+    build.add_argument("--check-gantry", action="store_true", help="Estimate beam deflection and colour profiles by load")
+
+    save = sub.add_parser("save", help="Save the current scene")
+    save.add_argument("path", nargs="?")
+    save.add_argument("--compress", action="store_true")
+
+    inspect = sub.add_parser("inspect", help="List scene objects")
+    inspect.add_argument("--path", help="Open this .blend first")
+
+    render = sub.add_parser("render", help="Render the current scene")
+    render.add_argument("--path", help="Open this .blend first")
+    render.add_argument("--fast", action="store_true", help="Workbench instead of Cycles")
+    render.add_argument("--output", default="optics_table_render.png")
+    render.add_argument("--resolution", type=int, nargs=2, default=(1024, 768))
+
+    views = sub.add_parser("render_views", help="Render several views/frames in one session")
+    views.add_argument("views", nargs="+", help="View names (see render_optics_table.VIEWS) or camera objects")
+    views.add_argument("--path", help="Open this .blend first")
+    views.add_argument("--frames", type=int, nargs="+")
+    views.add_argument("--fast", action="store_true", help="Workbench instead of Cycles")
+    views.add_argument("--threads", type=int, help="Fixed CPU thread count")
+    views.add_argument("--samples", type=int, default=128, help="Cycles samples per image")
+    views.add_argument("--output-dir", default="renders")
+    views.add_argument("--stats", default="render_stats.json")
+    views.add_argument("--resolution", type=int, nargs=2, default=(1024, 768))
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.cmd == "start":
+        info = start_worker(args.blender, args.port, args.open)
+        print(f"Worker ready on port {args.port}: Blender {info['result']['blender']}")
+        return 0
+
+    options = {k: v for k, v in vars(args).items() if k not in ("cmd", "port") and v is not None}
+    if "output" in options:
+        options["output"] = os.path.abspath(options["output"])
+    for key in ("path", "save", "output_dir", "stats"):
+        if options.get(key):
+            options[key] = os.path.abspath(options[key])
+
+    response = send(args.cmd, options, port=args.port)
+    if response.get("output"):
+        print(response["output"], end="")
+    if not response["ok"]:
+        print(response["error"], file=sys.stderr)
+        return 1
+
+    result = response.get("result")
+    if args.cmd == "inspect":
+        for obj in result:
+            print(f"{obj['name']:<40} {obj['type']:<8} parent={obj['parent'] or '-'}")
+        print(f"{len(result)} objects")
+    elif args.cmd == "render_views":
+        for image in result:
+            print(f"{image['view']:<10} frame {image['frame']:<5} {image['seconds']:7.2f}s  {image['output']}")
+    else:
+        print(json.dumps(result, indent=2))
+    print(f"({response['elapsed']:.2f}s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())